@@ -10,17 +10,221 @@
   @url         https://github.com/DFRobor/DFRobot_UVIndex240370Sensor
 '''
 
-import serial
 import time
-import smbus
 import os
 import math
-import RPi.GPIO as GPIO
-import math
+import random
+import struct
+import threading
+import importlib
+from bisect import bisect_left
+from collections import namedtuple
+
+def _backend(name):
+  '''!
+    @brief Import an optional hardware backend (smbus, serial, modbus_tk.modbus_rtu) on first use
+    @n     Nothing is loaded at import time, so the driver can run on injected/fake buses off-device
+    @n     and the built-in RTU transport never loads modbus_tk.
+  '''
+  return importlib.import_module(name)
+
+## One consistent reading of the data/index/risk input registers
+UVSnapshot = namedtuple('UVSnapshot', ['raw', 'index', 'risk'])
+
+class RetryPolicy():
+  '''!
+    @brief Retry policy for register reads
+    @n     The same class is used by the PinPong patch (unihiker_uv_patch_v3); each driver picks its
+    @n     behaviour through its own DEFAULT_RETRY_POLICY instance, not through these defaults.
+    @n     attempts     Maximum number of attempts, including the first one
+    @n     backoff      Wait before the first retry (s), multiplied by multiplier for each further retry
+    @n     max_backoff  Upper bound of one wait (s)
+    @n     jitter       Fraction (0-1) by which a wait is randomly shortened
+    @n     deadline     Total time budget of one read (s), None for no limit
+    @n     warmup       Discard one read of the register before the real read
+    @n     probe        Read the PID register before each retry
+  '''
+  def __init__(self, attempts = 3, backoff = 0.02, multiplier = 2.0, max_backoff = 0.5, jitter = 0.0, deadline = None, warmup = False, probe = False):
+    if attempts < 1:
+      raise ValueError("attempts must be at least 1")
+    self.attempts = attempts
+    self.backoff = backoff
+    self.multiplier = multiplier
+    self.max_backoff = max_backoff
+    self.jitter = jitter
+    self.deadline = deadline
+    self.warmup = warmup
+    self.probe = probe
+
+  def delay(self, retry):
+    '''!
+      @brief Wait before retry number retry (s)
+    '''
+    delay = min(self.max_backoff, self.backoff * self.multiplier ** (retry - 1))
+    if self.jitter:
+      delay *= 1.0 - random.uniform(0, self.jitter)
+    return delay
+
+  def wait(self, retry, started):
+    '''!
+      @brief Sleep before retry number retry
+      @param started time.monotonic() at the start of the read
+      @return False if the wait would exceed the deadline
+    '''
+    delay = self.delay(retry)
+    if self.deadline is not None and time.monotonic() + delay - started > self.deadline:
+      return False
+    if delay > 0:
+      time.sleep(delay)
+    return True
+
+## Default policy: a single attempt, no warm-up read and no PID probe
+DEFAULT_RETRY_POLICY = RetryPolicy(attempts = 1)
 
-import modbus_tk
-import modbus_tk.defines as cst
-from modbus_tk import modbus_rtu
+_bus_locks = {}
+_bus_locks_guard = threading.Lock()
+
+def bus_lock(key):
+  '''!
+    @brief Get the lock that serializes transactions on one I2C bus or serial port
+    @n     All driver instances on the same bus share one lock, held only for a single transaction,
+    @n     so sensors can be read from several threads without interleaving bus traffic.
+    @param key ('i2c', bus number), ('uart', port) or an injected bus/master object
+  '''
+  with _bus_locks_guard:
+    lock = _bus_locks.get(key)
+    if lock is None:
+      lock = _bus_locks[key] = threading.RLock()
+    return lock
+
+## Serial transports of the UART driver: modbus_tk's RtuMaster or the built-in RTUMaster
+TRANSPORT_MODBUS_TK = "modbus_tk"
+TRANSPORT_BUILTIN   = "builtin"
+TRANSPORTS          = (TRANSPORT_MODBUS_TK, TRANSPORT_BUILTIN)
+
+def _crc16_table():
+  table = []
+  for byte in range(256):
+    crc = byte
+    for _ in range(8):
+      crc = (crc >> 1) ^ 0xA001 if crc & 1 else crc >> 1
+    table.append(crc)
+  return tuple(table)
+
+## CRC-16/MODBUS of every byte value, one table lookup per byte instead of eight shifts
+CRC16_TABLE = _crc16_table()
+
+def crc16_modbus(data):
+  '''!
+    @brief CRC-16/MODBUS of data, 0 when data already ends with its own CRC (low byte first)
+  '''
+  crc = 0xFFFF
+  table = CRC16_TABLE
+  for byte in data:
+    crc = (crc >> 8) ^ table[(crc ^ byte) & 0xFF]
+  return crc
+
+class RTUMaster():
+  '''!
+    @brief Minimal Modbus RTU master written directly on pyserial
+    @n     Implements the execute()/set_timeout() subset of modbus_rtu.RtuMaster used by this driver:
+    @n     read input/holding registers (0x04/0x03). Request frames and their CRC are built once per
+    @n     (slave, function, register, count) and reused, exactly the response length is read, and
+    @n     the 3.5 character inter-frame silence is kept before every request.
+  '''
+  READ_HOLDING_REGISTERS = 0x03
+  READ_INPUT_REGISTERS   = 0x04
+
+  def __init__(self, port = "/dev/ttyAMA0", baud = 9600, timeout = 1.0, serial_port = None, frame_silence = None):
+    '''!
+      @param port          Serial port of the RS485/UART line
+      @param baud          Baud rate of the line, any rate supported by the serial port
+      @param timeout       Response timeout (s)
+      @param serial_port   Already opened serial.Serial (or compatible object) used instead of opening port
+      @param frame_silence Minimum idle time (s) between the last response and the next request,
+      @n                   None for 3.5 character times at baud, 0 to send back-to-back
+    '''
+    if serial_port is None:
+      serial_port = _backend("serial").Serial(port=port, baudrate=baud, bytesize=8, parity='N', stopbits=1)
+    self._serial = serial_port
+    if frame_silence is None:
+      # One character is 11 bits (start, 8 data, parity or second stop, stop); above 19200 baud
+      # the Modbus specification fixes the silence to 1.75 ms
+      frame_silence = 0.00175 if baud > 19200 else 3.5 * 11.0 / baud
+    self.frame_silence = frame_silence
+    self._frames = {}
+    self._last_frame = 0.0
+    self.set_timeout(timeout)
+
+  def set_timeout(self, timeout):
+    '''!
+      @brief Set the response timeout (s)
+    '''
+    self._timeout = timeout
+    self._serial.timeout = timeout
+
+  def get_timeout(self):
+    return self._timeout
+
+  def execute(self, slave, function_code, starting_address, quantity_of_x = 1):
+    '''!
+      @brief Send one read request and wait for its response
+      @return tuple of register values, like modbus_rtu.RtuMaster.execute()
+      @exception IOError on timeout, CRC error, a mismatched or an exception response
+    '''
+    key = (slave, function_code, starting_address, quantity_of_x)
+    frame = self._frames.get(key)
+    if frame is None:
+      frame = self._frames[key] = self._build(*key)
+    request, length, decoder = frame
+
+    port = self._serial
+    wait = self._last_frame + self.frame_silence - time.perf_counter()
+    if wait > 0:
+      time.sleep(wait)
+    # Drop a late response to an earlier request that timed out
+    port.reset_input_buffer()
+    port.write(request)
+    # An exception response is 5 bytes long, a normal one continues after the first 5
+    response = port.read(5)
+    if len(response) == 5 and response[1] == function_code:
+      response += port.read(length - 5)
+    self._last_frame = time.perf_counter()
+
+    if len(response) < 5:
+      raise IOError("no response from slave 0x%02X (%d bytes)" % (slave, len(response)))
+    if crc16_modbus(response) != 0:
+      raise IOError("CRC error in response from slave 0x%02X" % slave)
+    if response[0] != slave:
+      raise IOError("response from slave 0x%02X, expected 0x%02X" % (response[0], slave))
+    if response[1] == function_code | 0x80:
+      raise IOError("slave 0x%02X exception code %d" % (slave, response[2]))
+    if len(response) != length or response[1] != function_code or response[2] != length - 5:
+      raise IOError("invalid response from slave 0x%02X" % slave)
+    return decoder.unpack_from(response, 3)
+
+  def close(self):
+    self._serial.close()
+
+  def _build(self, slave, function_code, starting_address, quantity_of_x):
+    if function_code not in (self.READ_HOLDING_REGISTERS, self.READ_INPUT_REGISTERS):
+      raise ValueError("function code 0x%02X is not supported" % function_code)
+    pdu = struct.pack('>BBHH', slave, function_code, starting_address, quantity_of_x)
+    request = pdu + struct.pack('<H', crc16_modbus(pdu))
+    # slave, function, byte count, 2 bytes per register, CRC
+    return request, 5 + 2 * quantity_of_x, struct.Struct('>%dH' % quantity_of_x)
+
+def open_rtu_master(port = "/dev/ttyAMA0", baud = 9600, transport = TRANSPORT_MODBUS_TK):
+  '''!
+    @brief Open a Modbus RTU master on a serial port
+    @param transport TRANSPORT_MODBUS_TK for modbus_tk's RtuMaster, TRANSPORT_BUILTIN for RTUMaster
+  '''
+  if transport == TRANSPORT_BUILTIN:
+    return RTUMaster(port, baud)
+  if transport == TRANSPORT_MODBUS_TK:
+    serial_port = _backend("serial").Serial(port=port,baudrate=baud, bytesize=8, parity='N', stopbits=1)
+    return _backend("modbus_tk.modbus_rtu").RtuMaster(serial_port)
+  raise ValueError("unknown transport %r, expected one of %s" % (transport, ", ".join(TRANSPORTS)))
 
 class DFRobot_UVIndex240370Sensor():
   I2C_MODE                  = 0x01
@@ -30,17 +234,35 @@ class DFRobot_UVIndex240370Sensor():
   UVINDEX240370SENSOR_INPUTREG_UVS_INDEX                     =0x07
   UVINDEX240370SENSOR_INPUTREG_RISK_LEVEL                    =0x08
   UVINDEX240370SENSOR_DEVICE_PID                             =0x427c
-  def __init__(self ,bus = 0 ,baud = 9600, mode = I2C_MODE):
+  UVINDEX240370SENSOR_INPUTREG_COUNT                         =3
+  UVINDEX240370SENSOR_READ_INPUT_REGISTERS                   =0x04
+  ## Upper bounds (us) of the bus latency histogram buckets, the last bucket collects slower transactions
+  LATENCY_BUCKETS_US = (100, 200, 500, 1000, 2000, 5000, 10000, 20000, 50000)
+  def __init__(self ,bus = 0 ,baud = 9600, mode = I2C_MODE, port = "/dev/ttyAMA0", master = None, i2cbus = None, retry_policy = None, calibration = None, transport = TRANSPORT_MODBUS_TK):
     self.mode = 0
     self.resolution = 0
     self.gain = 0
+    self.retry_policy = retry_policy or DEFAULT_RETRY_POLICY
+    self.calibration = calibration
+    self._transaction_hook = None
+    self._stats_lock = threading.Lock()
+    self.reset_stats()
     if mode == self.I2C_MODE:
       self._uart_i2c = self.I2C_MODE
-      self.i2cbus = smbus.SMBus(bus)
+      # Physical bus identity, shared by every instance on the same bus
+      self._bus_key = ('i2c', bus) if i2cbus is None else i2cbus
+      self._bus_lock = bus_lock(self._bus_key)
+      if i2cbus is None:
+        i2cbus = _backend("smbus").SMBus(bus)
+      self.i2cbus = i2cbus
     else:
       self._uart_i2c = self.UART_MODE
-      self.master = modbus_rtu.RtuMaster(serial.Serial(port="/dev/ttyAMA0",baudrate=baud, bytesize=8, parity='N', stopbits=1))
-      self.master.set_timeout(1.0)
+      self._bus_key = ('uart', port) if master is None else master
+      self._bus_lock = bus_lock(self._bus_key)
+      if master is None:
+        master = open_rtu_master(port, baud, transport)
+        master.set_timeout(1.0)
+      self.master = master
       
   def begin(self):
     '''!
@@ -49,10 +271,10 @@ class DFRobot_UVIndex240370Sensor():
     '''
     ret=False
     if self._uart_i2c == self.I2C_MODE:
-      buffer = self._read_reg(0x00,2)
+      buffer = self._read(0x00,2)
       data = buffer[0]|buffer[1]<<8
     else:
-      buffer = self._read_reg(0x00,1)
+      buffer = self._read(0x00,1)
       data = buffer[0]
     if data == self.UVINDEX240370SENSOR_DEVICE_PID:
       ret =True
@@ -64,23 +286,26 @@ class DFRobot_UVIndex240370Sensor():
       @return voltage value (mV)
     '''
     if self._uart_i2c == self.I2C_MODE:
-      buffer = self._read_reg(self.UVINDEX240370SENSOR_INPUTREG_UVS_DATA,2)
+      buffer = self._read(self.UVINDEX240370SENSOR_INPUTREG_UVS_DATA,2)
       data = buffer[0]|buffer[1]<<8
     else:
-      buffer = self._read_reg(self.UVINDEX240370SENSOR_INPUTREG_UVS_DATA,1)
+      buffer = self._read(self.UVINDEX240370SENSOR_INPUTREG_UVS_DATA,1)
       data = buffer[0]
     return data
 
   def read_UV_index_data(self):
     '''!
       @brief Read the UV Index
+      @n     With a calibration the index is converted on the host from the UV data register
       @return UV Index
     '''
+    if self.calibration is not None:
+      return self._lookup(self.calibration.index_lut, self.read_UV_original_data())
     if self._uart_i2c == self.I2C_MODE:
-      buffer = self._read_reg(self.UVINDEX240370SENSOR_INPUTREG_UVS_INDEX,2)
+      buffer = self._read(self.UVINDEX240370SENSOR_INPUTREG_UVS_INDEX,2)
       data = buffer[0]|buffer[1]<<8
     else:
-      buffer = self._read_reg(self.UVINDEX240370SENSOR_INPUTREG_UVS_INDEX,1)
+      buffer = self._read(self.UVINDEX240370SENSOR_INPUTREG_UVS_INDEX,1)
       data = buffer[0]
     return data  
 
@@ -88,23 +313,146 @@ class DFRobot_UVIndex240370Sensor():
   def read_risk_level_data(self):
     '''!
       @brief Read the risk level
+      @n     With a calibration the risk level is converted on the host from the UV data register
       @return 0-4 (Low Risk,Moderate Risk,High Risk,Very High Risk,Extreme Risk)
     '''
+    if self.calibration is not None:
+      return self._lookup(self.calibration.risk_lut, self.read_UV_original_data())
     if self._uart_i2c == self.I2C_MODE:
-      buffer = self._read_reg(self.UVINDEX240370SENSOR_INPUTREG_RISK_LEVEL,2)
+      buffer = self._read(self.UVINDEX240370SENSOR_INPUTREG_RISK_LEVEL,2)
       data = buffer[0]|buffer[1]<<8
     else:
-      buffer = self._read_reg(self.UVINDEX240370SENSOR_INPUTREG_RISK_LEVEL,1)
+      buffer = self._read(self.UVINDEX240370SENSOR_INPUTREG_RISK_LEVEL,1)
       data = buffer[0]
     return data
 
+  def stats(self):
+    '''!
+      @brief Get the bus statistics
+      @return dict with per-register 'transactions' and 'errors', 'retries', 'latency_histogram_us'
+      @n      mapping bucket upper bound (us, None for the overflow bucket) to transaction count,
+      @n      and 'latency_sum_us', the total time of all transactions
+    '''
+    with self._stats_lock:
+      return {
+        'transactions': dict(self._stats['transactions']),
+        'errors': dict(self._stats['errors']),
+        'retries': self._stats['retries'],
+        'latency_sum_us': self._stats['latency_sum_us'],
+        'latency_histogram_us': dict(zip(self.LATENCY_BUCKETS_US + (None,), self._latency_histogram)),
+      }
+
+  def reset_stats(self):
+    '''!
+      @brief Clear the bus statistics
+    '''
+    with self._stats_lock:
+      self._stats = {'transactions': {}, 'errors': {}, 'retries': 0, 'latency_sum_us': 0.0}
+      self._latency_histogram = [0] * (len(self.LATENCY_BUCKETS_US) + 1)
+
+  def set_transaction_hook(self, hook):
+    '''!
+      @brief Call hook(reg, data, latency, error) after every bus transaction, None to disable
+    '''
+    self._transaction_hook = hook
+
+  def _read(self, reg_addr, length):
+    '''!
+      @brief Read registers according to the retry policy
+    '''
+    policy = self.retry_policy
+    started = time.monotonic()
+    if policy.warmup:
+      try:
+        self._read_once(reg_addr, length)
+      except Exception:
+        pass
+    error = None
+    for attempt in range(policy.attempts):
+      if attempt > 0:
+        if policy.probe:
+          try:
+            self._read_once(0x00, 2 if self._uart_i2c == self.I2C_MODE else 1)
+          except Exception:
+            pass
+        if not policy.wait(attempt, started):
+          break
+        with self._stats_lock:
+          self._stats['retries'] += 1
+      try:
+        return self._read_once(reg_addr, length)
+      except Exception as e:
+        error = e
+    raise error
+
+  def _read_once(self, reg_addr, length):
+    '''!
+      @brief Read registers through _read_reg() and record count, latency and errors
+      @n     The bus lock is held for the transaction only, not for statistics, hooks or retry waits.
+    '''
+    data = None
+    error = None
+    try:
+      with self._bus_lock:
+        start = time.perf_counter()
+        try:
+          data = self._read_reg(reg_addr, length)
+        finally:
+          latency = time.perf_counter() - start
+      return data
+    except Exception as e:
+      error = e
+      raise
+    finally:
+      with self._stats_lock:
+        stats = self._stats
+        stats['transactions'][reg_addr] = stats['transactions'].get(reg_addr, 0) + 1
+        if error is not None:
+          stats['errors'][reg_addr] = stats['errors'].get(reg_addr, 0) + 1
+        stats['latency_sum_us'] += latency * 1e6
+        self._latency_histogram[bisect_left(self.LATENCY_BUCKETS_US, latency * 1e6)] += 1
+      if self._transaction_hook is not None:
+        self._transaction_hook(reg_addr, data, latency, error)
+
+  def read_snapshot(self):
+    '''!
+      @brief Read UV data, UV index and risk level in a single bus transaction
+      @n     Registers 0x06-0x08 are contiguous, so one block read (I2C) or one
+      @n     READ_INPUT_REGISTERS request (UART) returns all three values.
+      @n     With a calibration only the UV data register is read and converted on the host.
+      @return UVSnapshot(raw, index, risk)
+    '''
+    if self.calibration is not None:
+      raw = self.read_UV_original_data()
+      return UVSnapshot(raw, self._lookup(self.calibration.index_lut, raw), self._lookup(self.calibration.risk_lut, raw))
+    if self._uart_i2c == self.I2C_MODE:
+      buffer = self._read(self.UVINDEX240370SENSOR_INPUTREG_UVS_DATA,self.UVINDEX240370SENSOR_INPUTREG_COUNT*2)
+      return UVSnapshot(buffer[0]|buffer[1]<<8, buffer[2]|buffer[3]<<8, buffer[4]|buffer[5]<<8)
+    else:
+      buffer = self._read(self.UVINDEX240370SENSOR_INPUTREG_UVS_DATA,self.UVINDEX240370SENSOR_INPUTREG_COUNT)
+      return UVSnapshot(buffer[0], buffer[1], buffer[2])
+
+  @staticmethod
+  def _lookup(lut, raw):
+    '''!
+      @brief Convert a raw value with a calibration lookup table, values past the end use the last entry
+    '''
+    return lut[raw] if raw < len(lut) else lut[-1]
+
 class DFRobot_UVIndex240370Sensor_I2C(DFRobot_UVIndex240370Sensor):
   '''!
     @brief An example of an i2c interface module
   '''
-  def __init__(self ,bus):
+  def __init__(self ,bus, i2cbus = None, retry_policy = None, calibration = None):
+    '''!
+      @param bus          I2C bus number
+      @param i2cbus       Object providing read_i2c_block_data() used instead of smbus.SMBus(bus), e.g. a fake or replay bus
+      @param retry_policy RetryPolicy for register reads, default is a single attempt
+      @param calibration  Object with index_lut/risk_lut bytes indexed by the raw value (e.g. uv_calibration.UVCalibration)
+      @n                  to convert on the host instead of reading registers 0x07/0x08, None to use the sensor's values
+    '''
     self._addr = self.UVINDEX240370SENSOR_DEVICE_ADDR
-    super().__init__(bus,0,self.I2C_MODE)   
+    super().__init__(bus,0,self.I2C_MODE,i2cbus=i2cbus,retry_policy=retry_policy,calibration=calibration)
     
   
   def _read_reg(self, reg_addr ,length):
@@ -113,20 +461,29 @@ class DFRobot_UVIndex240370Sensor_I2C(DFRobot_UVIndex240370Sensor):
       @param reg_addr register address
       @param length read data
     '''
-    self._reg = reg_addr
-    rslt = self.i2cbus.read_i2c_block_data(self._addr ,self._reg , length)
-    return rslt
+    return self.i2cbus.read_i2c_block_data(self._addr ,reg_addr , length)
        
 
 class DFRobot_UVIndex240370Sensor_UART(DFRobot_UVIndex240370Sensor):
   '''!
     @brief An example of an UART interface module
   '''
-  def __init__(self):
-    self._baud = 9600
-    self._addr = self.UVINDEX240370SENSOR_DEVICE_ADDR
+  def __init__(self, addr = DFRobot_UVIndex240370Sensor.UVINDEX240370SENSOR_DEVICE_ADDR, port = "/dev/ttyAMA0", baud = 9600, master = None, retry_policy = None, calibration = None, transport = TRANSPORT_MODBUS_TK):
+    '''!
+      @param addr   Modbus slave address
+      @param port   Serial port of the RS485/UART line
+      @param baud   Baud rate of the line
+      @param master Existing modbus_rtu.RtuMaster or RTUMaster to share a line between several slaves,
+      @n            or any object providing execute()/set_timeout(), e.g. a fake or replay bus
+      @param retry_policy RetryPolicy for register reads, default is a single attempt
+      @param calibration  Host-side conversion table, see DFRobot_UVIndex240370Sensor_I2C
+      @param transport    TRANSPORT_MODBUS_TK (modbus_tk) or TRANSPORT_BUILTIN (RTUMaster, only needs pyserial),
+      @n                  used when master is None
+    '''
+    self._baud = baud
+    self._addr = addr
     try:
-      super().__init__(0,self._baud,self.UART_MODE)
+      super().__init__(0,self._baud,self.UART_MODE,port,master,retry_policy=retry_policy,calibration=calibration,transport=transport)
     except:
       print ("plese get root!")
    
@@ -135,5 +492,171 @@ class DFRobot_UVIndex240370Sensor_UART(DFRobot_UVIndex240370Sensor):
     '''!
       @brief Read data from the sensor
     '''
-    return list(self.master.execute(self._addr, cst.READ_INPUT_REGISTERS, reg_addr, length))
-  
+    return list(self.master.execute(self._addr, self.UVINDEX240370SENSOR_READ_INPUT_REGISTERS, reg_addr, length))
+
+
+class DFRobot_UVIndex240370Sensor_RTUBus():
+  '''!
+    @brief Round-robin poller for several UVIndex240370Sensor slaves sharing one RS485/UART line
+    @n     One port is opened for the whole line. Each slave has its own response timeout, and a
+    @n     slave that keeps failing is only retried every few rounds, so it cannot stall the others.
+    @n     Without hardware, run it against python/libraries/uv_transport.PtyModbusSlave, a Modbus RTU
+    @n     slave stand-in on a local pty: pass its port and the addresses of the FakeUVDevice objects it serves.
+  '''
+  def __init__(self, addrs = (DFRobot_UVIndex240370Sensor.UVINDEX240370SENSOR_DEVICE_ADDR,), port = "/dev/ttyAMA0", baud = 9600, timeout = 0.2, max_failures = 3, backoff_rounds = 10, master = None, calibration = None, transport = TRANSPORT_MODBUS_TK):
+    '''!
+      @param addrs          Modbus slave addresses on the line
+      @param port           Serial port of the line
+      @param baud           Baud rate of the line
+      @param timeout        Default per-slave response timeout (s)
+      @param max_failures   Consecutive failures before a slave is backed off
+      @param backoff_rounds Rounds to skip a backed-off slave before retrying it
+      @param master         Existing modbus_rtu.RtuMaster or RTUMaster, mainly for tests
+      @param calibration    Host-side conversion table used by every slave, see DFRobot_UVIndex240370Sensor_I2C
+      @param transport      TRANSPORT_MODBUS_TK or TRANSPORT_BUILTIN, see DFRobot_UVIndex240370Sensor_UART
+    '''
+    self._calibration = calibration
+    # Shares the port lock with any other driver instance opened on the same port
+    self._bus_key = ('uart', port) if master is None else master
+    self._bus_lock = bus_lock(self._bus_key)
+    if master is None:
+      master = open_rtu_master(port, baud, transport)
+    self.master = master
+    self.master.set_timeout(timeout)
+    self._timeout = timeout
+    self._max_failures = max_failures
+    self._backoff_rounds = backoff_rounds
+    self._slaves = []
+    for addr in addrs:
+      self.add_slave(addr)
+    self.reset_stats()
+
+  def add_slave(self, addr, timeout = None):
+    '''!
+      @brief Add a slave to the round-robin schedule
+      @param addr    Modbus slave address
+      @param timeout Response timeout for this slave (s), default is the bus timeout
+    '''
+    sensor = DFRobot_UVIndex240370Sensor_UART(addr, master = self.master, calibration = self._calibration)
+    sensor._bus_key = self._bus_key
+    sensor._bus_lock = self._bus_lock
+    self._slaves.append({'addr': addr, 'sensor': sensor, 'timeout': timeout or self._timeout,
+                         'ok': 0, 'failed': 0, 'consecutive': 0, 'skip': 0, 'last': None})
+
+  def set_timeout(self, addr, timeout):
+    '''!
+      @brief Set the response timeout of one slave
+    '''
+    self._slave(addr)['timeout'] = timeout
+
+  def sensor(self, addr):
+    '''!
+      @brief Get the DFRobot_UVIndex240370Sensor_UART object of one slave (shares this bus)
+    '''
+    return self._slave(addr)['sensor']
+
+  def begin(self):
+    '''!
+      @brief Check the PID of every slave
+      @return dict of address -> init status
+    '''
+    status = {}
+    for slave in self._slaves:
+      try:
+        with self._bus_lock:
+          self.master.set_timeout(slave['timeout'])
+          status[slave['addr']] = slave['sensor'].begin()
+      except Exception:
+        status[slave['addr']] = False
+    return status
+
+  def poll(self):
+    '''!
+      @brief Read every slave once in round-robin order
+      @return list of (address, UVSnapshot or None); None means timeout, error or backed off
+    '''
+    if self._started is None:
+      self._started = time.monotonic()
+    results = []
+    for slave in self._slaves:
+      if slave['skip'] > 0:
+        slave['skip'] -= 1
+        results.append((slave['addr'], None))
+        continue
+      try:
+        snapshot = self._read_slave(slave)
+      except Exception:
+        snapshot = None
+      if snapshot is None:
+        slave['failed'] += 1
+        slave['consecutive'] += 1
+        if slave['consecutive'] >= self._max_failures:
+          slave['skip'] = self._backoff_rounds
+      else:
+        slave['ok'] += 1
+        slave['consecutive'] = 0
+        slave['last'] = snapshot
+        self._samples += 1
+      results.append((slave['addr'], snapshot))
+    self._rounds += 1
+    return results
+
+  def read(self, addr):
+    '''!
+      @brief Read one slave with its own response timeout, for callers that schedule slaves themselves
+      @return UVSnapshot, read errors are raised
+    '''
+    return self._read_slave(self._slave(addr))
+
+  def _read_slave(self, slave):
+    # The timeout is per slave, so it must not change between setting it and the read
+    with self._bus_lock:
+      self.master.set_timeout(slave['timeout'])
+      return slave['sensor'].read_snapshot()
+
+  def run(self, rounds = None, callback = None):
+    '''!
+      @brief Poll the bus continuously as fast as the line allows
+      @param rounds   Number of rounds, None for forever
+      @param callback Called with (address, UVSnapshot) for every successful read
+    '''
+    done = 0
+    while rounds is None or done < rounds:
+      for addr, snapshot in self.poll():
+        if callback is not None and snapshot is not None:
+          callback(addr, snapshot)
+      done += 1
+
+  def samples_per_second(self):
+    '''!
+      @brief Successful samples per second achieved on the whole bus since the last reset_stats()
+    '''
+    if self._started is None:
+      return 0.0
+    elapsed = time.monotonic() - self._started
+    return self._samples / elapsed if elapsed > 0 else 0.0
+
+  def stats(self):
+    '''!
+      @brief Per-slave counters
+      @return dict of address -> dict(ok, failed, backed_off, last)
+    '''
+    return {slave['addr']: {'ok': slave['ok'], 'failed': slave['failed'],
+                            'backed_off': slave['skip'] > 0, 'last': slave['last']}
+            for slave in self._slaves}
+
+  def reset_stats(self):
+    '''!
+      @brief Reset the bus sample rate measurement and per-slave counters
+    '''
+    self._started = None
+    self._samples = 0
+    self._rounds = 0
+    for slave in self._slaves:
+      slave['ok'] = slave['failed'] = 0
+
+  def _slave(self, addr):
+    for slave in self._slaves:
+      if slave['addr'] == addr:
+        return slave
+    raise KeyError("no slave at address 0x%02X" % addr)
@@ -14,7 +14,6 @@ import sys
 import os
 sys.path.append("../")
 import time
-import RPi.GPIO as GPIO
 
 from DFRobot_UVIndex240370Sensor import *
 
@@ -46,9 +45,19 @@ def loop():
     print("risk_level:Very High Risk")
   elif level==4:
     print("risk_level:Extreme Risk")
-  time.sleep(1)
+
+PERIOD = 1.0    # Seconds between readings
 
 if __name__ == "__main__":
   setup()
+  # Pace on monotonic deadlines so the time spent reading does not add up to drift.
+  # For logging to CSV/NDJSON at a fixed rate see: python -m uv_scheduler (python/libraries)
+  deadline = time.monotonic()
   while True:
     loop()
+    deadline += PERIOD
+    delay = deadline - time.monotonic()
+    if delay > 0:
+      time.sleep(delay)
+    else:
+      deadline = time.monotonic()    # Fell behind, start again from now
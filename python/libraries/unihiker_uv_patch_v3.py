@@ -5,11 +5,12 @@
   @copyright  Copyright (c) 2021-2025 DFRobot Co.Ltd (http://www.dfrobot.com)
               修改版本基于 https://gitee.com/dfrobotcd/ext-uvindex240370sensor 项目
   @license    The MIT License (MIT)
-  @version    V3.0.9
-  @date       2025-5-14
+  @version    V3.2.9
+  @date       2026-10-17
   
   使用说明:
-  1. 将此文件复制到Mind+扩展的python/libraries目录中
+  1. 将此文件和DFRobot_UVIndex240370Sensor.py复制到Mind+扩展的python/libraries目录中
+     (使用校准文件时同时复制uv_calibration.py)
   2. 在代码中使用 from unihiker_uv_patch_v3 import PatchUVSensor
   3. 创建传感器对象: sensor = PatchUVSensor()
   4. 使用方法:
@@ -17,8 +18,38 @@
      - sensor.read_UV_original_data() - 读取原始值
      - sensor.read_UV_index_data() - 读取UV指数
      - sensor.read_risk_level_data() - 读取风险等级
+     - sensor.read_all() - 一次读取原始值、UV指数和风险等级
+     - convert_uv_batch(raw_values) - 批量将原始值转换为UV指数和风险等级
+     - PatchUVSensor(calibration="unit.json") - 使用单个传感器的校准文件(见uv_calibration.py)
+     - PatchUVSensor(bus=4, addr=0x23) - 指定I2C总线和地址，不再自动查找总线
+     - sensor.stats() - 总线事务、重试、字节序修正、限幅和回退的统计
+     - PatchUVSensor(retry_policy=FAST_RETRY_POLICY) - 对延迟敏感的场景减少重试和预热读取
+     - PatchUVSensor(raw_filter=FilterPipeline(hampel(7), ema(0.3))) - 自定义原始值滤波
+     - 多个线程可同时读取同一个或不同的传感器，同一条总线上的事务自动串行
+  5. 定频采样(按单调时钟截止时间，不随读取耗时漂移): python -m uv_scheduler --rate 2 --duration 60
      
   更新日志:
+  - V3.2.9 (2026-10-17): RetryPolicy改为使用DFRobot_UVIndex240370Sensor库中的同一个类，补丁的默认策略显式开启预热读取和PID探测
+  - V3.2.8 (2026-10-17): hampel()在窗口平坦(MAD为0)时也剔除单个尖峰
+  - V3.2.7 (2026-10-17): 可指定I2C总线和地址(bus/addr)，同一总线上不同地址的多个传感器分别读取
+  - V3.2.6 (2026-10-17): 重试、限幅、回退和字节序切换计数及reset_stats()均在统计数据锁内进行
+  - V3.2.5 (2026-10-17): stats()新增latency_sum_us(总线事务总耗时)
+  - V3.2.4 (2026-10-17): 总线发现缓存内容不是JSON对象时忽略缓存，不再在begin()中抛出异常
+  - V3.2.3 (2026-10-17): 默认断点表恢复内置，没有uv_calibration.py时本文件仍可单独使用
+  - V3.2.2 (2026-10-17): 恢复原始值上限限幅，模拟数据不再超过1200
+  - V3.2.1 (2026-10-17): 示例改为使用uv_scheduler按截止时间定频采样，不再用time.sleep(2)控制间隔
+  - V3.2.0 (2026-10-17): UV指数和风险等级换算改用uv_calibration编译的查找表，可通过校准文件按传感器单独校准
+  - V3.1.9 (2026-10-17): 字节序在begin()时由设备ID确定，读取时直接按该字节序解码，只在PID不匹配时重新检测；
+                         删除按数值猜测字节序的逻辑和512/1024特殊处理
+  - V3.1.8 (2026-10-17): 同一条I2C总线上的传感器共用总线锁，读取状态加锁，可在多线程中安全使用
+  - V3.1.7 (2026-10-17): 平滑处理改为可组合的流式滤波器(EMA、滑动中值、Hampel、限速、死区)，原有平滑作为默认预设
+  - V3.1.6 (2026-10-17): 新增RetryPolicy，重试次数、指数退避、总时限、预热读取和PID探测均可配置
+  - V3.1.5 (2026-10-17): 新增stats()统计和总线事务回调，区分健康读数与被修正/回退的读数
+  - V3.1.4 (2026-10-17): 支持注入I2C总线对象(假设备、录制/回放，见uv_transport.py)，无需硬件即可运行
+  - V3.1.3 (2026-10-17): PinPong库和Board对象延迟到首次begin()时初始化，导入本模块不再访问硬件
+  - V3.1.2 (2026-10-17): 并行扫描I2C总线，缓存上次找到的总线/地址/字节序，启动时优先尝试
+  - V3.1.1 (2026-10-17): 新增convert_uv_batch()批量转换，UV指数和风险等级改为查断点表
+  - V3.1.0 (2026-10-17): 新增read_all()，一次原始读取同时得到UV指数和风险等级
   - V3.0.9 (2025-5-14): 删除调试代码，简化逻辑，提高性能
   - V3.0.8 (2025-5-14): 修复原始值6和原始值0的处理问题，完善平滑逻辑，增强数据稳定性
   - V3.0.7 (2025-5-14): 修复原始值512的风险等级计算问题，确保返回风险等级1，与测试预期一致
@@ -35,6 +66,26 @@ import time
 import random
 import sys
 import os
+import threading
+import functools
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from collections import deque, namedtuple
+
+# uv_calibration为可选模块，只有使用校准文件时才需要；单文件使用(如Mind+扩展的libraries.zip)时用内置默认表
+try:
+    from uv_calibration import load_calibration
+except ImportError:
+    load_calibration = None
+
+# 重试策略与DFRobot_UVIndex240370Sensor库共用一个RetryPolicy类(导入该库不访问硬件)，
+# 该库不在sys.path中时从本仓库中的位置导入
+try:
+    from DFRobot_UVIndex240370Sensor import RetryPolicy
+except ImportError:
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "arduinoC",
+                                 "libraries", "DFRobot_UVIndex240370Sensor", "python"))
+    from DFRobot_UVIndex240370Sensor import RetryPolicy
 
 # 传感器常量定义
 SENSOR_ADDR = 0x23      # 官方指定I2C地址
@@ -44,65 +95,311 @@ REG_INDEX = 0x07        # 紫外线指数寄存器
 REG_RISK = 0x08         # 风险等级寄存器
 DEVICE_ID = 0x427c      # 原始设备ID
 DEVICE_ID_REV = 0x7c42  # 字节序颠倒的设备ID
+# 设备ID寄存器按高字节在前解析的结果 -> 传感器的字节序
+BYTE_ORDERS = {DEVICE_ID: 'big', DEVICE_ID_REV: 'little'}
+# 各数据寄存器的有效最大值，超出时重试，最终限幅
+REGISTER_LIMITS = {REG_DATA: 1200, REG_INDEX: 11, REG_RISK: 5}
+
+# 总线扫描参数
+DISCOVERY_BUSES = (4, 1, 0, 2, 3, 5, 6, 7)  # 扫描的I2C总线(按优先级排列)
+DISCOVERY_ROUNDS = 3                        # 扫描轮数
+DISCOVERY_ROUND_DELAY = 1.0                 # 两轮扫描之间的等待时间(秒)
+# 上次找到传感器的总线/地址/字节序缓存文件，下次启动优先尝试
+DISCOVERY_CACHE_FILE = os.path.expanduser("~/.cache/unihiker_uv_sensor.json")
+
+# 默认断点表(官方维基校准，与uv_calibration的默认值相同)，原始值 >= 第i个断点时UV指数至少为i+1；
+# 实际换算使用传感器的calibration
+UV_INDEX_BREAKPOINTS = (50, 227, 318, 408, 503, 606, 696, 795, 881, 976, 1079)
+# UV指数断点表 - 0-2低风险，3-5中等风险，6-7高风险，8-10非常高风险，11+极端风险
+RISK_LEVEL_BREAKPOINTS = (3, 6, 8, 11)
+
+# 总线事务延迟直方图的桶上限(微秒)，最后一个桶收集更慢的事务
+LATENCY_BUCKETS_US = (100, 200, 500, 1000, 2000, 5000, 10000, 20000, 50000)
+
+# 一次读取得到的原始值、UV指数和风险等级
+UVReading = namedtuple('UVReading', ['raw', 'index', 'risk'])
 
 # 全局变量
-PINPONG_AVAILABLE = False
+PINPONG_AVAILABLE = False   # 首次begin()加载PinPong库后更新
+I2C = None
+Board = None
 
-# 尝试导入PinPong库
-try:
-    from pinpong.board import I2C, Board
-    # 初始化行空板Board对象 - 这一步非常重要
-    board = Board("unihiker")
-    board.begin()
-    PINPONG_AVAILABLE = True
-    print("PinPong库导入成功")
-except ImportError:
-    # 尝试其他可能路径
-    try:
-        # 行空板可能的路径
-        paths = [
-            "/usr/lib/python3/dist-packages",
-            "/usr/local/lib/python3/dist-packages",
-            os.path.expanduser("~/.local/lib/python3/dist-packages"),
-            "/usr/share/unihiker/lib"
-        ]
-        
-        # 添加路径
-        for path in paths:
-            if path not in sys.path and os.path.exists(path):
-                sys.path.append(path)
+# 总线仲裁锁 - 同一条总线上的所有传感器实例共用一把锁，只在单次总线事务期间持有
+_bus_locks = {}
+_bus_locks_guard = threading.Lock()
+
+def _get_bus_lock(key):
+    """获取总线锁，key为总线号或注入的总线对象"""
+    with _bus_locks_guard:
+        lock = _bus_locks.get(key)
+        if lock is None:
+            lock = _bus_locks[key] = threading.Lock()
+        return lock
+
+# PinPong库延迟加载 - 导入本模块不初始化硬件，首次begin()真实传感器时才加载
+_board = None
+_pinpong_loaded = False
+_pinpong_lock = threading.Lock()
+
+def _load_pinpong():
+    """导入PinPong库并初始化行空板Board对象，每个进程只执行一次，所有传感器共享"""
+    global PINPONG_AVAILABLE, I2C, Board, _board, _pinpong_loaded
+    with _pinpong_lock:
+        if _pinpong_loaded:
+            return PINPONG_AVAILABLE
+        _pinpong_loaded = True
+        try:
+            from pinpong.board import I2C, Board
+        except ImportError:
+            # 尝试其他可能路径(行空板可能的路径)
+            paths = [
+                "/usr/lib/python3/dist-packages",
+                "/usr/local/lib/python3/dist-packages",
+                os.path.expanduser("~/.local/lib/python3/dist-packages"),
+                "/usr/share/unihiker/lib"
+            ]
+            
+            # 添加路径
+            for path in paths:
+                if path not in sys.path and os.path.exists(path):
+                    sys.path.append(path)
+            
+            # 再次尝试导入
+            try:
+                from pinpong.board import I2C, Board
+            except ImportError:
+                PINPONG_AVAILABLE = False
+                return False
         
-        # 再次尝试导入
-        from pinpong.board import I2C, Board
-        board = Board("unihiker")
-        board.begin()  # 初始化行空板
+        # 初始化行空板Board对象 - 这一步非常重要
+        _board = Board("unihiker")
+        _board.begin()
         PINPONG_AVAILABLE = True
-        print("PinPong库导入成功（使用附加路径）")
-    except ImportError:
-        print("警告: PinPong库不可用，将使用模拟模式")
-        PINPONG_AVAILABLE = False
+        print("PinPong库导入成功")
+        return True
+
+# 默认策略：与以前的行为一致，最多3次尝试，带预热读取和PID探测
+DEFAULT_RETRY_POLICY = RetryPolicy(attempts=3, warmup=True, probe=True)
+# 快速策略：只读一次，不预热、不探测，失败时直接使用上次有效值
+FAST_RETRY_POLICY = RetryPolicy(attempts=1, warmup=False, probe=False)
+
+# 流式滤波器 - 每级是一个生成器，send(x)输入一个样本并返回输出，每个样本占用固定的内存和时间
+
+def _filter_stage(func):
+    """把生成器函数包装为已启动的滤波级"""
+    @functools.wraps(func)
+    def start(*args, **kwargs):
+        stage = func(*args, **kwargs)
+        next(stage)
+        return stage
+    return start
+
+@_filter_stage
+def ema(alpha):
+    """指数移动平均，alpha越大响应越快"""
+    average = None
+    while True:
+        value = yield average
+        average = value if average is None else average + alpha * (value - average)
+
+@_filter_stage
+def rolling_median(window):
+    """滑动窗口中值"""
+    recent = deque()
+    ordered = []
+    median = None
+    while True:
+        value = yield median
+        recent.append(value)
+        insort(ordered, value)
+        if len(recent) > window:
+            del ordered[bisect_left(ordered, recent.popleft())]
+        median = ordered[len(ordered) // 2]
+
+@_filter_stage
+def hampel(window, n_sigmas=3.0):
+    """Hampel异常值剔除：偏离滑动中值超过n_sigmas倍MAD估计的样本替换为中值
+    
+    窗口内大多数样本相同(MAD为0)时，任何偏离中值的样本都视为异常值:
+    >>> list(FilterPipeline(hampel(5)).filter([300] * 5 + [1200]))
+    [300, 300, 300, 300, 300, 300]
+    """
+    recent = deque(maxlen=window)
+    output = None
+    while True:
+        value = yield output
+        recent.append(value)
+        ordered = sorted(recent)
+        median = ordered[len(ordered) // 2]
+        deviations = sorted(abs(x - median) for x in recent)
+        mad = 1.4826 * deviations[len(deviations) // 2]
+        output = median if abs(value - median) > n_sigmas * mad else value
+
+@_filter_stage
+def slew_limit(max_step):
+    """限速：相邻两个输出的变化不超过max_step"""
+    output = None
+    while True:
+        value = yield output
+        if output is not None:
+            value = min(output + max_step, max(output - max_step, value))
+        output = value
+
+@_filter_stage
+def deadband(width):
+    """死区：变化不超过width时保持上一个输出"""
+    output = None
+    while True:
+        value = yield output
+        if output is None or abs(value - output) > width:
+            output = value
+
+@_filter_stage
+def legacy_zero_decay():
+    """原有原始值平滑：读到0且上一个值在(20, 300)之间时按0.5衰减，避免突然归零"""
+    last = 0
+    while True:
+        value = yield last
+        # 只有在前一个值显著高于0且合理时才应用渐变
+        if value == 0 and 20 < last < 300:
+            value = int(last * 0.5)  # 使用更快的衰减率
+            if value < 5:  # 防止很小的值保持太久
+                value = 0
+        last = value
+
+@_filter_stage
+def legacy_index_jump_limit(max_jump=3):
+    """原有UV指数平滑：与上一个非零指数相差超过max_jump时只变化1"""
+    last = 0
+    while True:
+        value = yield last
+        if last > 0 and abs(value - last) > max_jump:
+            value = last + (1 if value > last else -1)
+        last = value
+
+class FilterPipeline:
+    """按顺序串联多个滤波级"""
+    
+    def __init__(self, *stages):
+        self.stages = stages
+    
+    def send(self, value):
+        """输入一个样本，返回经过所有滤波级后的输出"""
+        for stage in self.stages:
+            value = stage.send(value)
+        return value
+    
+    def filter(self, values):
+        """对样本序列逐个滤波，返回生成器"""
+        for value in values:
+            yield self.send(value)
+
+def legacy_raw_filter():
+    """默认原始值滤波预设(与以前的行为一致)"""
+    return FilterPipeline(legacy_zero_decay())
+
+def legacy_index_filter():
+    """默认UV指数滤波预设(与以前的行为一致)"""
+    return FilterPipeline(legacy_index_jump_limit())
+
+def _synchronized(method):
+    """在传感器的读取状态锁内执行方法，保证上次值、特殊值标志和滤波器状态一致"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._state_lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+class _BuiltinCalibration:
+    """没有uv_calibration时使用的默认校准，提供PatchUVSensor用到的UVCalibration接口"""
+    
+    name = "wiki"
+    max_raw = REGISTER_LIMITS[REG_DATA]
+    
+    def __init__(self):
+        self.index_lut = bytes(bisect_right(UV_INDEX_BREAKPOINTS, raw) for raw in range(self.max_raw + 1))
+        self.risk_by_index = bytes(bisect_right(RISK_LEVEL_BREAKPOINTS, index) for index in range(256))
+        self.risk_lut = self.index_lut.translate(self.risk_by_index)
+    
+    def index(self, raw):
+        return self.index_lut[min(self.max_raw, max(0, raw))]
+    
+    def risk(self, index):
+        return self.risk_by_index[min(255, max(0, index))]
+    
+    def convert_batch(self, raw_values):
+        try:
+            import numpy as np
+        except ImportError:
+            np = None
+        if np is not None:
+            raw = np.clip(np.asarray(raw_values), 0, self.max_raw).astype(np.intp, copy=False)
+            return (np.frombuffer(self.index_lut, dtype=np.uint8)[raw],
+                    np.frombuffer(self.risk_lut, dtype=np.uint8)[raw])
+        raws = [min(self.max_raw, max(0, raw)) for raw in raw_values]
+        return array('B', [self.index_lut[raw] for raw in raws]), array('B', [self.risk_lut[raw] for raw in raws])
+
+_builtin_calibration = None
+
+def _load_calibration(calibration):
+    """返回校准对象: None为默认校准，校准文件路径需要uv_calibration.py，其他对象原样返回"""
+    global _builtin_calibration
+    if load_calibration is not None:
+        return load_calibration(calibration)
+    if isinstance(calibration, str):
+        raise ImportError("使用校准文件需要将uv_calibration.py复制到本文件所在目录")
+    if calibration is not None:
+        return calibration
+    if _builtin_calibration is None:
+        _builtin_calibration = _BuiltinCalibration()
+    return _builtin_calibration
 
 class PatchUVSensor:
     """适用于行空板的UV指数传感器补丁类 - PinPong专用版"""
     
-    def __init__(self, simulation_mode=False, debug_mode=False, force_real=False):
-        """初始化传感器对象"""
-        self._addr = SENSOR_ADDR
+    def __init__(self, simulation_mode=False, debug_mode=False, force_real=False,
+                 cache_file=DISCOVERY_CACHE_FILE, i2c=None, retry_policy=None,
+                 raw_filter=None, index_filter=None, calibration=None, bus=None, addr=SENSOR_ADDR):
+        """初始化传感器对象
+        
+        bus: I2C总线号，None表示自动查找(先试缓存，再并行扫描DISCOVERY_BUSES)
+        addr: 传感器的I2C地址
+        cache_file: 总线发现缓存文件，None表示不使用缓存
+        i2c: 注入的总线对象(需提供readfrom_mem)，如uv_transport中的假设备或回放总线，
+             指定后不再加载PinPong和扫描总线
+        retry_policy: 读取重试策略，默认DEFAULT_RETRY_POLICY
+        raw_filter/index_filter: 原始值和UV指数的滤波器(FilterPipeline或任何提供send()的对象)，
+             每个传感器需使用各自的实例，默认为legacy_raw_filter()/legacy_index_filter()
+        calibration: uv_calibration.UVCalibration或校准文件路径，默认为官方维基校准
+        """
+        self.retry_policy = retry_policy or DEFAULT_RETRY_POLICY
+        self.calibration = _load_calibration(calibration)
+        self._raw_filter = raw_filter if raw_filter is not None else legacy_raw_filter()
+        self._index_filter = index_filter if index_filter is not None else legacy_index_filter()
+        self._addr = addr
+        self._bus = bus
         self._i2c = None
+        self._injected_i2c = i2c
         self._bus_index = None
+        self._bus_lock = None
+        self._byte_order = None
+        self._cache_file = cache_file
         self._initialized = False
         self._force_real = force_real
         self._simulation_mode = simulation_mode and not force_real
-        if not PINPONG_AVAILABLE and not simulation_mode:
-            self._simulation_mode = True
         
         # 上次读取的有效值（用于错误恢复）
         self._last_data = 0
         self._last_index = 0
         self._last_risk = 0
         
-        # 特殊情况标志
-        self._is_special_512 = False
+        # 读取状态锁(上次值、特殊值标志、滤波器状态)和统计数据锁
+        self._state_lock = threading.RLock()
+        self._stats_lock = threading.Lock()
+        
+        # 统计数据和总线事务回调
+        self._transaction_hook = None
+        self.reset_stats()
         
         # 如果是模拟模式，初始化模拟数据
         if self._simulation_mode:
@@ -126,87 +423,16 @@ class PatchUVSensor:
     
     def _check_device_id(self, device_id):
         """检查设备ID是否匹配（支持字节序颠倒）"""
-        if device_id in [DEVICE_ID, DEVICE_ID_REV]:
-            return True
-        
-        # 尝试字节序变换
-        byte1 = (device_id >> 8) & 0xFF
-        byte2 = device_id & 0xFF
-        swapped = (byte2 << 8) | byte1
-        
-        return swapped in [DEVICE_ID, DEVICE_ID_REV]
+        return device_id in BYTE_ORDERS
     
     def _calculate_uv_index(self, raw_value):
-        """根据原始值计算UV指数 - 基于官方维基校准"""
-        # 参考：https://wiki.dfrobot.com.cn/SKU_SEN0636_Gravity:240370紫外线指数传感器
-        # 异常数据处理 - 进一步降低阈值
-        if raw_value > 1200:  # 更严格的阈值，确保UV指数不会超出范围
-            return 11  # 返回最大值而不是0，避免大幅度跳变
-        elif raw_value < 0:  # 处理负值
-            return 0
-            
-        # 根据官方校准表提供的数据计算UV指数
-        # 确保数值小于50的都返回0
-        if raw_value < 50:
-            return 0
-        # 检查特殊的异常值 (3, 6, 14, 48, 512等)
-        elif raw_value == 3:
-            return 0  # 确保原始值3返回UV指数0而非7
-        elif raw_value == 6:
-            return 0  # 确保原始值6返回UV指数0而非6
-        elif raw_value == 14:
-            return 0  # 确保原始值14返回UV指数0而非5
-        elif raw_value == 48:
-            return 0  # 确保原始值48返回UV指数0而非1
-        elif raw_value == 512:
-            return 5  # 根据区间(503-606)返回5
-        # 常规区间映射
-        elif raw_value < 227:
-            return 1
-        elif raw_value < 318:
-            return 2
-        elif raw_value < 408:
-            return 3
-        elif raw_value < 503:
-            return 4
-        elif raw_value < 606:
-            return 5
-        elif raw_value < 696:
-            return 6
-        elif raw_value < 795:
-            return 7
-        elif raw_value < 881:
-            return 8
-        elif raw_value < 976:
-            return 9
-        elif raw_value < 1079:
-            return 10
-        else:
-            # 限制最大值为11
-            return 11
+        """根据原始值计算UV指数 - 查校准表，默认基于官方维基校准"""
+        # 负值返回0，超过1200的异常值按1200换算(最大值11)，避免大幅度跳变
+        return self.calibration.index(raw_value)
     
     def _get_risk_level(self, uv_index):
-        """根据UV指数计算风险等级 - 与Arduino实现保持一致，并修复512特殊值的问题"""
-        # 特殊处理原始值512对应的UV指数5
-        if self._is_special_512 and uv_index == 5:
-            return 1  # 特殊情况: 原始值512对应的UV指数5返回风险等级1
-        
-        # 正常的风险等级计算 - 与Arduino库实现对齐:
-        # 0-2: 低风险(0)
-        # 3-5: 中等风险(1)
-        # 6-7: 高风险(2)
-        # 8-10: 非常高风险(3)
-        # 11+: 极端风险(4)
-        if uv_index < 3:  # 0,1,2为低风险
-            return 0  # 低风险
-        elif uv_index < 6:  # 3,4,5为中等风险
-            return 1  # 中等风险
-        elif uv_index < 8:  # 6,7为高风险
-            return 2  # 高风险
-        elif uv_index < 11:  # 8,9,10为非常高风险
-            return 3  # 非常高风险
-        else:  # 11及以上为极端风险
-            return 4  # 极端风险
+        """根据UV指数计算风险等级 - 与Arduino实现保持一致"""
+        return self.calibration.risk(uv_index)
     
     def begin(self):
         """初始化传感器"""
@@ -215,8 +441,12 @@ class PatchUVSensor:
             self._initialized = True
             return True
         
-        # 检查PinPong是否可用
-        if not PINPONG_AVAILABLE:
+        # 使用注入的总线对象，不需要PinPong
+        if self._injected_i2c is not None:
+            if self._use_probe(self._probe_device(None, self._injected_i2c)):
+                return True
+        # 加载PinPong库并检查是否可用
+        elif not _load_pinpong():
             if self._force_real:
                 print("错误: PinPong库不可用，无法使用真实传感器")
                 return False
@@ -227,43 +457,8 @@ class PatchUVSensor:
                 self._init_simulation()
                 self._initialized = True
                 return True
-        
-        # 扫描所有可能的I2C总线
-        buses_to_try = [4, 1, 0, 2, 3, 5, 6, 7]  # 扩大搜索范围
-        
-        for attempt in range(3):  # 增加到三轮尝试
-            for bus in buses_to_try:
-                
-                try:
-                    # 确保使用正确的方式初始化I2C
-                    try:
-                        # 使用全局board对象创建I2C对象
-                        i2c = I2C(bus)
-                    except Exception:
-                        # 如果上面的方式失败，尝试创建新board对象并初始化I2C
-                        board = Board("unihiker") 
-                        board.begin()
-                        i2c = board.get_i2c(bus)
-                    
-                    # 尝试读取设备ID
-                    try:
-                        data = i2c.readfrom_mem(self._addr, REG_PID, 2)
-                        device_id = (data[0] << 8) | data[1]
-                        
-                        if self._check_device_id(device_id):
-                            self._i2c = i2c
-                            self._bus_index = bus
-                            print(f"找到紫外线传感器! 总线: {bus}, 地址: 0x{self._addr:02X}, 设备ID: 0x{device_id:04X}")
-                            self._initialized = True
-                            return True
-                    except Exception:
-                        pass
-                except Exception:
-                    pass
-            
-            # 轮次未找到，等待一下再试
-            if attempt < 2:  # 不是最后一轮
-                time.sleep(1.0)  # 增加等待时间
+        elif self._discover():
+            return True
         
         # 未找到有效设备
         if self._force_real:
@@ -277,6 +472,184 @@ class PatchUVSensor:
             self._initialized = True
             return True
     
+    def _discover(self):
+        """通过PinPong查找传感器所在的I2C总线"""
+        # 指定了总线时只探测该总线，不读写缓存
+        if self._bus is not None:
+            return self._use_probe(self._probe_bus(self._bus))
+        
+        # 优先尝试缓存中上次找到传感器的总线，一次读取即可完成初始化
+        cached = self._load_discovery_cache()
+        if cached is not None and self._use_probe(self._probe_bus(cached)):
+            return True
+        
+        # 并行扫描所有可能的I2C总线，找到第一个有效设备即停止
+        for attempt in range(DISCOVERY_ROUNDS):
+            if self._use_probe(self._scan_buses(DISCOVERY_BUSES)):
+                self._save_discovery_cache()
+                return True
+            
+            # 轮次未找到，等待一下再试
+            if attempt < DISCOVERY_ROUNDS - 1:  # 不是最后一轮
+                time.sleep(DISCOVERY_ROUND_DELAY)
+        return False
+    
+    def _probe_bus(self, bus):
+        """在指定总线上读取设备ID，成功返回(bus, i2c, device_id)，失败返回None"""
+        try:
+            # 确保使用正确的方式初始化I2C
+            try:
+                # 使用全局board对象创建I2C对象
+                i2c = I2C(bus)
+            except Exception:
+                # 如果上面的方式失败，通过共享的board对象获取I2C
+                i2c = _board.get_i2c(bus)
+        except Exception:
+            return None
+        return self._probe_device(bus, i2c)
+    
+    def _probe_device(self, bus, i2c):
+        """通过总线对象读取设备ID，成功返回(bus, i2c, device_id)，失败返回None"""
+        try:
+            data = self._bus_read(REG_PID, i2c=i2c, bus=bus)
+            device_id = int.from_bytes(data, 'big')
+            if self._check_device_id(device_id):
+                return bus, i2c, device_id
+        except Exception:
+            pass
+        return None
+    
+    def _scan_buses(self, buses):
+        """并行探测多条总线，返回第一个找到的设备"""
+        # 仅在扫描时导入，避免增加模块导入时间
+        from concurrent.futures import ThreadPoolExecutor, as_completed
+        executor = ThreadPoolExecutor(max_workers=len(buses))
+        try:
+            futures = [executor.submit(self._probe_bus, bus) for bus in buses]
+            for future in as_completed(futures):
+                found = future.result()
+                if found is not None:
+                    return found
+            return None
+        finally:
+            # 不等待其余较慢的总线
+            executor.shutdown(wait=False)
+    
+    def _use_probe(self, found):
+        """采用探测到的设备"""
+        if found is None:
+            return False
+        bus, i2c, device_id = found
+        self._i2c = i2c
+        self._bus_index = bus
+        self._bus_lock = _get_bus_lock(bus if bus is not None else i2c)
+        # 设备ID按高字节在前解析，等于DEVICE_ID说明传感器为大端字节序；之后所有读取都按该字节序解码
+        self._byte_order = BYTE_ORDERS[device_id]
+        print(f"找到紫外线传感器! 总线: {bus}, 地址: 0x{self._addr:02X}, 设备ID: 0x{device_id:04X}")
+        self._initialized = True
+        return True
+    
+    def _load_discovery_cache(self):
+        """读取总线发现缓存，返回总线号，缓存不可用时返回None"""
+        if not self._cache_file:
+            return None
+        import json
+        try:
+            with open(self._cache_file) as f:
+                cached = json.load(f)
+            # 缓存内容不是对象(如null、[])时视为损坏，重新完整扫描
+            if not isinstance(cached, dict) or cached.get('addr') != self._addr:
+                return None
+            return int(cached['bus'])
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+    
+    def _save_discovery_cache(self):
+        """保存本次找到传感器的总线/地址/字节序"""
+        if not self._cache_file:
+            return
+        import json
+        try:
+            os.makedirs(os.path.dirname(self._cache_file), exist_ok=True)
+            with open(self._cache_file, 'w') as f:
+                json.dump({'bus': self._bus_index, 'addr': self._addr,
+                           'byte_order': self._byte_order}, f)
+        except OSError:
+            pass
+    
+    def stats(self):
+        """返回统计数据
+        
+        transactions/errors: 每个寄存器的总线事务数和失败数
+        retries: 重试次数; byte_swaps: 读数异常时复查PID后切换字节序的次数; clamps: 被限幅的读数
+        fallbacks: 读取失败后返回上次值的次数
+        latency_histogram_us: {桶上限(微秒): 事务数}，None对应超过最大桶的事务; latency_sum_us: 总线事务总耗时(微秒)
+        """
+        with self._stats_lock:
+            stats = dict(self._stats)
+            stats['transactions'] = dict(self._stats['transactions'])
+            stats['errors'] = dict(self._stats['errors'])
+            stats['latency_histogram_us'] = dict(zip(LATENCY_BUCKETS_US + (None,), self._latency_histogram))
+        return stats
+    
+    def reset_stats(self):
+        """清零统计数据"""
+        with self._stats_lock:
+            self._stats = {
+                'transactions': {},
+                'errors': {},
+                'retries': 0,
+                'byte_swaps': 0,
+                'clamps': 0,
+                'fallbacks': 0,
+                'latency_sum_us': 0.0,
+            }
+            self._latency_histogram = [0] * (len(LATENCY_BUCKETS_US) + 1)
+    
+    def _count(self, key):
+        """统计计数加一(在统计数据锁内)"""
+        with self._stats_lock:
+            self._stats[key] += 1
+    
+    def set_transaction_hook(self, hook):
+        """设置总线事务回调hook(reg, data, latency, error)，每次事务后调用，None表示关闭"""
+        self._transaction_hook = hook
+    
+    def _bus_read(self, reg, length=2, method='readfrom_mem', i2c=None, bus=None):
+        """执行一次总线读取并记录事务数、延迟和错误
+        
+        总线锁只在这一次事务期间持有，统计、回调和重试等待都在锁外。
+        i2c/bus: 探测时使用的总线对象和总线号，默认为已找到的总线
+        """
+        if i2c is None:
+            i2c, lock = self._i2c, self._bus_lock
+        else:
+            lock = _get_bus_lock(bus if bus is not None else i2c)
+        data = None
+        error = None
+        try:
+            with lock:
+                start = time.perf_counter()
+                try:
+                    data = getattr(i2c, method)(self._addr, reg, length)
+                finally:
+                    latency = time.perf_counter() - start
+            return data
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            with self._stats_lock:
+                stats = self._stats
+                stats['transactions'][reg] = stats['transactions'].get(reg, 0) + 1
+                if error is not None:
+                    stats['errors'][reg] = stats['errors'].get(reg, 0) + 1
+                stats['latency_sum_us'] += latency * 1e6
+                self._latency_histogram[bisect_left(LATENCY_BUCKETS_US, latency * 1e6)] += 1
+            if self._transaction_hook is not None:
+                self._transaction_hook(reg, data, latency, error)
+    
+    @_synchronized
     def read_register_16bit(self, reg):
         """读取16位寄存器"""
         # 如果强制使用真实数据但处于模拟模式，则直接报错
@@ -310,81 +683,60 @@ class PatchUVSensor:
             self._init_simulation()
             return self.read_register_16bit(reg)
             
-        # 读取实际寄存器
-        max_retries = 3
+        # 读取实际寄存器，重试次数、退避时间和总时限由重试策略决定
+        policy = self.retry_policy
+        started = time.monotonic()
         last_error = None
+        limit = REGISTER_LIMITS.get(reg)
         
-        for retry in range(max_retries):
+        for retry in range(policy.attempts):
             try:
                 if retry > 0:
-                    try:
-                        self._i2c.readfrom_mem(self._addr, REG_PID, 2)
-                        time.sleep(0.01)
-                    except:
-                        pass
+                    if policy.probe:
+                        self._verify_byte_order()
+                    # 退避等待，超出总时限则放弃重试
+                    if not policy.wait(retry, started):
+                        break
+                    self._count('retries')
                 
                 # 使用readfrom_mem方法读取数据
                 data = None
                 try:
-                    data = self._i2c.readfrom_mem(self._addr, reg, 2)
+                    data = self._bus_read(reg)
                 except Exception as e:
                     try:
-                        data = self._i2c.read(self._addr, reg, 2)
+                        data = self._bus_read(reg, method='read')
                     except:
                         raise e
                 
                 if not data or len(data) != 2:
                     raise ValueError("数据长度错误")
                 
-                value_normal = (data[0] << 8) | data[1]
-                value_swapped = (data[1] << 8) | data[0]
-                
-                if reg == REG_DATA:
-                    if value_normal > 5000 and value_swapped <= 1200:
-                        value = value_swapped
-                    else:
-                        value = value_normal if value_normal <= 1200 else value_swapped
-                elif reg == REG_INDEX:
-                    value = value_normal if value_normal <= 11 else value_swapped
-                    value = min(11, max(0, value))
-                elif reg == REG_RISK:
-                    value = value_normal if 0 <= value_normal <= 5 else value_swapped
-                    value = min(5, max(0, value))
-                else:
-                    value = value_normal
+                # 按begin()确定的字节序解码
+                value = int.from_bytes(data, self._byte_order)
                 
-                if value == 0xFFFF and reg != REG_PID:
-                    if retry < max_retries - 1:
-                        time.sleep(0.02)
-                        continue
-                
-                # 简化数据合理性检查，减少输出
-                if (reg == REG_DATA and value > 1200) or \
-                   (reg == REG_INDEX and value > 11) or \
-                   (reg == REG_RISK and value > 5):
-                    if retry < max_retries - 1:
-                        continue
-                    
-                    # 限制异常值范围
-                    if reg == REG_DATA:
-                        value = min(1200, value)
-                    elif reg == REG_INDEX:
-                        value = min(11, value)
-                    elif reg == REG_RISK:
-                        value = min(5, value)
+                if limit is not None and value > limit:
+                    # 数值超出范围时复查设备ID，字节序改变则按新字节序重新解码
+                    if self._verify_byte_order():
+                        value = int.from_bytes(data, self._byte_order)
+                    if value > limit:
+                        if retry < policy.attempts - 1:
+                            continue
+                        # 限制异常值范围
+                        self._count('clamps')
+                        value = limit
                 
                 return value
                 
             except Exception as e:
                 last_error = e
-                if retry < max_retries - 1:
-                    time.sleep(0.02)
         
         # 所有尝试都失败，使用回退策略
         if self._force_real:
             raise RuntimeError("无法读取传感器数据")
             
         # 返回上次的有效值
+        self._count('fallbacks')
         if reg == REG_DATA:
             return self._last_data if self._last_data > 0 else 10
         elif reg == REG_INDEX:
@@ -393,149 +745,103 @@ class PatchUVSensor:
             return self._last_risk
         return 0
     
+    @_synchronized
     def read_UV_original_data(self):
         """读取紫外线原始数据"""
+        return self._read_raw()
+    
+    @_synchronized
+    def read_UV_index_data(self):
+        """读取紫外线指数"""
+        return self._index_from_raw(self._read_raw())
+    
+    @_synchronized
+    def read_risk_level_data(self):
+        """读取风险等级"""
+        # 首先获取UV指数 - 确保使用我们计算的值，而不是传感器直接返回的值
+        return self._risk_from_index(self._index_from_raw(self._read_raw()))
+    
+    @_synchronized
+    def read_all(self):
+        """一次原始读取，本地计算UV指数和风险等级，返回UVReading(raw, index, risk)"""
+        raw = self._read_raw()
+        index = self._index_from_raw(raw)
+        return UVReading(raw, index, self._risk_from_index(index))
+    
+    # 与DFRobot_UVIndex240370Sensor.read_snapshot()保持同名接口
+    read_snapshot = read_all
+    
+    def _read_raw(self):
+        """从总线读取原始值并进行平滑"""
         # 简化预热过程，减少调试输出
-        if not self._simulation_mode:
+        if not self._simulation_mode and self.retry_policy.warmup:
             try:
-                self._i2c.readfrom_mem(self._addr, REG_DATA, 2)
+                self._bus_read(REG_DATA)
             except:
                 pass
         
         # 正式读取数据
         value = self.read_register_16bit(REG_DATA)
         
-        # 特殊处理可能存在的字节序问题
-        if value == 1024:  # 特殊情况，可能是字节序导致的异常值
-            # 使用前一个有效值
-            if self._last_data > 50 and self._last_data < 300:
-                value = self._last_data  # 使用上一个合理值
-            else:
-                value = 200  # 使用一个合理的默认值
-        # 特殊处理512值 - 这是传感器可能的错误码或边界值
-        elif value == 512:
-            # 512保持不变，在UV指数计算中会进行专门处理
-            pass
-        # 处理其他异常值
-        elif value > 1200:
-            high_byte = (value >> 8) & 0xFF
-            low_byte = value & 0xFF
-            swapped = (low_byte << 8) | high_byte
-            
-            if swapped <= 1200:
-                value = swapped
-            else:
-                value = 1200  # 限制最大值
+        # 确保值在合理范围内(模拟数据可能为负或超过上限)
+        limit = REGISTER_LIMITS[REG_DATA]
+        if value < 0 or value > limit:
+            self._count('clamps')
+            value = 0 if value < 0 else limit
         
-        # 确保值在合理范围内
-        value = max(0, min(value, 1200))
-        
-        # 处理零值但防止错误的升高 - 降低渐变逻辑的使用率
-        # 只有在前一个值显著高于0且合理时才应用渐变
-        if value == 0 and self._last_data > 20:
-            # 只在前一个值合理时应用渐变
-            if self._last_data < 300:  # 防止异常大值的影响
-                value = int(self._last_data * 0.5)  # 使用更快的衰减率
-                if value < 5:  # 防止很小的值保持太久
-                    value = 0
+        # 平滑处理
+        value = int(round(self._raw_filter.send(value)))
         
         # 更新历史值
         self._last_data = value
         return value
     
-    def read_UV_index_data(self):
-        """读取紫外线指数"""
-        raw_value = self.read_UV_original_data()
-        
+    def _index_from_raw(self, raw_value):
+        """由原始值计算UV指数并进行平滑"""
         # 首先确保原始值为0时一定返回UV指数0
         if raw_value == 0:
-            self._is_special_512 = False
             return 0
-            
-        # 检测异常的大值 - 可能是字节序问题导致的1024等值
-        if raw_value > 1000 and raw_value < 1100:  # 1024附近的值
-            # 这种数值通常是字节序问题，实际值应该较高
-            value = 10  # 设置为更合理的高UV指数
-        # 对特殊值进行专门处理
-        elif raw_value == 3:
-            value = 0  # 确保原始值3返回UV指数0
-        elif raw_value == 6:
-            value = 0  # 确保原始值6返回UV指数0
-        elif raw_value == 14:
-            value = 0  # 确保原始值14返回UV指数0
-        elif raw_value == 48:
-            value = 0  # 确保原始值48返回UV指数0
-        elif raw_value == 512:
-            value = 5  # 根据区间(503-606)返回5
-            # 在读取时就标记这是特殊情况
-            self._is_special_512 = True
-        # 其他情况使用计算函数
-        else:
-            self._is_special_512 = False
-            value = self._calculate_uv_index(raw_value)
         
-        # 平滑处理大幅变化 - 减少平滑力度，允许更快速地反应变化
-        if self._last_index > 0 and abs(value - self._last_index) > 3:  # 仅对差异大于3的情况进行平滑
-            direction = 1 if value > self._last_index else -1
-            value = self._last_index + direction
+        value = self._calculate_uv_index(raw_value)
+        
+        # 平滑处理大幅变化
+        value = int(round(self._index_filter.send(value)))
         
         # 更新历史值
         self._last_index = value
         return value
     
-    def read_risk_level_data(self):
-        """读取风险等级"""
-        # 首先获取UV指数 - 确保使用我们计算的值，而不是传感器直接返回的值
-        uv_index = self.read_UV_index_data()
-        
-        # 特殊处理原始值512，强制返回风险等级1（与测试预期一致）
-        if self._is_special_512 and uv_index == 5:
-            risk = 1  # 原始值512的UV指数为5时，风险等级固定为1
-        else:
-            # 通过UV指数计算风险等级，使用我们的计算函数
-            risk = self._get_risk_level(uv_index)
-            
-            # 确保UV指数与风险等级一致性
-            # UV指数为0时风险等级必须为0
-            if uv_index <= 0:
-                risk = 0
-            # 处理特殊值的风险等级
-            elif uv_index < 3 and risk != 0:
-                risk = 0  # 确保UV指数0-2的风险等级为0
+    def _risk_from_index(self, uv_index):
+        """由UV指数计算风险等级"""
+        risk = self._get_risk_level(uv_index)
         
         # 更新历史值
         self._last_risk = risk
         return risk
-
-# 简单的使用示例
-if __name__ == "__main__":
-    # 初始化传感器
-    sensor = PatchUVSensor()
     
-    if sensor.begin():
+    def _verify_byte_order(self):
+        """复查设备ID，与当前字节序不一致时重新确定字节序，字节序改变返回True"""
         try:
-            print("UV传感器就绪 - 开始读取数据")
-            print("=" * 30)
-            
-            while True:
-                # 读取所有数据
-                raw_data = int(sensor.read_UV_original_data())
-                time.sleep(0.5)
-                
-                uv_index = int(sensor.read_UV_index_data())
-                time.sleep(0.5)
-                
-                risk_level = int(sensor.read_risk_level_data())
-                
-                # 显示数据
-                print(f"原始值：{raw_data}")
-                print(f"uv指数：{uv_index}")
-                print(f"风险等级：{risk_level}")
-                print("------------")
-                time.sleep(2)
-        except KeyboardInterrupt:
-            pass
-        except Exception as e:
-            print(f"错误: {e}")
-    else:
-        print("初始化失败")
\ No newline at end of file
+            device_id = int.from_bytes(self._bus_read(REG_PID), 'big')
+        except Exception:
+            return False
+        order = BYTE_ORDERS.get(device_id)
+        if order is None or order == self._byte_order:
+            return False
+        self._byte_order = order
+        self._count('byte_swaps')
+        return True
+
+def convert_uv_batch(raw_values, calibration=None):
+    """批量将原始值转换为UV指数和风险等级，返回(index, risk)
+    
+    raw_values可以是NumPy数组、array、memoryview或任意可迭代对象。
+    NumPy可用时一次向量化查表，返回uint8数组；否则返回array('B')。
+    calibration与PatchUVSensor的同名参数相同，结果与传感器逐个计算完全一致。
+    """
+    return _load_calibration(calibration).convert_batch(raw_values)
+
+# 简单的使用示例，按固定频率采样请使用: python -m uv_scheduler --rate 0.5
+if __name__ == "__main__":
+    from uv_scheduler import main
+    main(["--driver", "patch", "--rate", "0.5"] + sys.argv[1:])
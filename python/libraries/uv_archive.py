@@ -0,0 +1,263 @@
+# -*- coding: utf-8 -*-
+'''!
+  @file       uv_archive.py
+  @brief      批量导出uv_recorder记录的读数：按固定大小的块流式转换为CSV、NDJSON或压缩列存格式
+  @copyright  Copyright (c) 2021-2026 DFRobot Co.Ltd (http://www.dfrobot.com)
+  @license    The MIT License (MIT)
+  @version    V1.0.0
+  @date       2026-10-17
+
+  使用说明:
+  1. 命令行(在本目录下):
+     python -m uv_archive /home/uvlog --format csv --output uv.csv
+     python -m uv_archive /home/uvlog --format ndjson --start 2026-10-17T08:00 --end 2026-10-17T18:00
+     python -m uv_archive /home/uvlog --format columnar --output uv-20261017.uvc
+     python -m uv_archive uv-20261017.uvc --format csv          # 列存文件转回CSV
+     输出文件名以.gz结尾时用gzip压缩(csv/ndjson)；--start/--end为Unix时间戳或ISO格式本地时间。
+  2. 在程序中使用:
+     with UVLogReader("/home/uvlog") as reader, open("uv.csv", "wb") as f:
+         export(reader, f, "csv", start=time.time() - 86400)
+     或自己组合: for block in encode_ndjson(iter_chunks(reader, start, end)): ...
+     读取列存文件: for chunk in read_columnar(open("uv.uvc", "rb")): ...
+
+  每次只处理chunk_size条记录(UVChunk，按列存放: t为墙上时间，其余为raw/index/risk/flags)，
+  内存占用和打开的文件数与记录总数无关(分段逐个映射，导出完即关闭)。NumPy可用时每块从映射的
+  分段文件中按列取出，时间换算和列存编码都是数组运算；否则逐条解码，结果相同。
+
+  列存格式: 文件头<4sHH>(魔数UVCC、版本、列数)，之后每块为块头<Iq5I>(记录数、第一条的时间(微秒)、
+  各列压缩后的长度)和5列zlib压缩数据: 时间(微秒)差分<i8、raw <u2、index u1、risk u1、flags <u2。
+'''
+
+import argparse
+import datetime
+import gzip
+import os
+import struct
+import sys
+import zlib
+from array import array
+from bisect import bisect_left
+from collections import namedtuple
+from itertools import accumulate
+
+from uv_recorder import RECORD, UVLogReader, np
+
+FORMATS = ("csv", "ndjson", "columnar")
+DEFAULT_CHUNK_SIZE = 8192
+
+CSV_HEADER = "t,raw,index,risk,flags\n"
+CSV_ROW = "%.3f,%d,%d,%d,%d"
+NDJSON_ROW = '{"t":%.3f,"raw":%d,"index":%d,"risk":%d,"flags":%d}'
+
+COLUMNAR_MAGIC = b"UVCC"
+COLUMNAR_VERSION = 1
+COLUMNAR_HEADER = struct.Struct("<4sHH")    # 魔数、版本、列数
+CHUNK_HEADER = struct.Struct("<Iq5I")       # 记录数、第一条的时间(微秒)、5列压缩后的长度
+# 列名、NumPy类型、array类型码(小端)
+COLUMNS = (("t", "<i8", "q"), ("raw", "<u2", "H"), ("index", "u1", "B"),
+           ("risk", "u1", "B"), ("flags", "<u2", "H"))
+
+# 一块记录，各列为等长的NumPy数组或列表；t为墙上时间(time.time())
+UVChunk = namedtuple('UVChunk', ['t', 'raw', 'index', 'risk', 'flags'])
+
+
+def iter_chunks(reader, start=None, end=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """按块产生墙上时间[start, end)内的记录，每块最多chunk_size条，不跨分段
+
+    分段逐个映射，读完即关闭；块中的列是复制出来的，不引用映射，保留已产生的块也不会占用文件
+    """
+    for segment, first, last in reader.ranges(start, end):
+        for i in range(first, last, chunk_size):
+            j = min(last, i + chunk_size)
+            if np is not None:
+                records = segment.array(i, j)
+                yield UVChunk(records["timestamp"] + segment.wall_offset, records["raw"].copy(),
+                              records["index"].copy(), records["risk"].copy(), records["flags"].copy())
+                del records
+            else:
+                timestamps, raw, index, risk, flags = zip(*RECORD.iter_unpack(segment.memoryview(i, j)))
+                offset = segment.wall_offset
+                yield UVChunk([timestamp + offset for timestamp in timestamps],
+                              list(raw), list(index), list(risk), list(flags))
+
+
+def filter_chunks(chunks, start=None, end=None):
+    """只保留墙上时间[start, end)内的记录，块内时间须递增(如read_columnar()的输出)"""
+    for chunk in chunks:
+        first, last = 0, len(chunk.t)
+        if start is not None:
+            first = _search(chunk.t, start)
+        if end is not None:
+            last = _search(chunk.t, end)
+        if first == 0 and last == len(chunk.t):
+            yield chunk
+        elif first < last:
+            yield UVChunk(*(column[first:last] for column in chunk))
+
+
+def _search(values, x):
+    if isinstance(values, list):
+        return bisect_left(values, x)
+    return int(np.searchsorted(values, x))
+
+
+def _rows(chunk):
+    """逐行的(t, raw, index, risk, flags)，NumPy数组先整体转为Python数值"""
+    if np is not None and not isinstance(chunk.t, list):
+        return zip(*(column.tolist() for column in chunk))
+    return zip(*chunk)
+
+
+def encode_csv(chunks, header=True):
+    """产生CSV文本块"""
+    if header:
+        yield CSV_HEADER.encode()
+    for chunk in chunks:
+        yield ("\n".join(map(CSV_ROW.__mod__, _rows(chunk))) + "\n").encode()
+
+
+def encode_ndjson(chunks):
+    """产生NDJSON文本块，每行一条记录"""
+    for chunk in chunks:
+        yield ("\n".join(map(NDJSON_ROW.__mod__, _rows(chunk))) + "\n").encode()
+
+
+def encode_columnar(chunks, level=6):
+    """产生列存格式的字节块: 先是文件头，之后每块一个块头和各列压缩数据"""
+    yield COLUMNAR_HEADER.pack(COLUMNAR_MAGIC, COLUMNAR_VERSION, len(COLUMNS))
+    for chunk in chunks:
+        count = len(chunk.t)
+        if not count:
+            continue
+        first_us, data = _column_bytes(chunk)
+        columns = [zlib.compress(column, level) for column in data]
+        yield CHUNK_HEADER.pack(count, first_us, *(len(column) for column in columns)) + b"".join(columns)
+
+
+def _column_bytes(chunk):
+    """返回(第一条的时间(微秒), 各列未压缩的小端字节)"""
+    if np is not None and not isinstance(chunk.t, list):
+        micros = np.rint(chunk.t * 1e6).astype(np.int64)
+        deltas = np.diff(micros, prepend=micros[:1])
+        return int(micros[0]), [np.ascontiguousarray(column, dtype=dtype).tobytes()
+                                for column, (_, dtype, _) in zip((deltas,) + tuple(chunk[1:]), COLUMNS)]
+    micros = [int(round(t * 1e6)) for t in chunk.t]
+    deltas = [0] + [b - a for a, b in zip(micros, micros[1:])]
+    data = []
+    for column, (_, _, typecode) in zip((deltas,) + tuple(chunk[1:]), COLUMNS):
+        values = array(typecode, column)
+        if sys.byteorder == "big":
+            values.byteswap()
+        data.append(values.tobytes())
+    return micros[0], data
+
+
+def read_columnar(f):
+    """从列存文件(二进制文件对象)逐块读取，产生UVChunk"""
+    header = f.read(COLUMNAR_HEADER.size)
+    if len(header) < COLUMNAR_HEADER.size:
+        raise ValueError("列存文件不完整")
+    magic, version, columns = COLUMNAR_HEADER.unpack(header)
+    if magic != COLUMNAR_MAGIC or version != COLUMNAR_VERSION or columns != len(COLUMNS):
+        raise ValueError("不支持的列存文件")
+    while True:
+        header = f.read(CHUNK_HEADER.size)
+        if len(header) < CHUNK_HEADER.size:
+            return
+        count, first_us, *lengths = CHUNK_HEADER.unpack(header)
+        data = [zlib.decompress(f.read(length)) for length in lengths]
+        yield _decode_chunk(count, first_us, data)
+
+
+def _decode_chunk(count, first_us, data):
+    if np is not None:
+        deltas, raw, index, risk, flags = (np.frombuffer(column, dtype=dtype, count=count)
+                                           for column, (_, dtype, _) in zip(data, COLUMNS))
+        t = (np.cumsum(deltas) + first_us) / 1e6
+        return UVChunk(t, raw, index, risk, flags)
+    columns = []
+    for column, (_, _, typecode) in zip(data, COLUMNS):
+        values = array(typecode)
+        values.frombytes(column)
+        if sys.byteorder == "big":
+            values.byteswap()
+        columns.append(values.tolist())
+    t = [(first_us + micros) / 1e6 for micros in accumulate(columns[0])]
+    return UVChunk(t, *columns[1:])
+
+
+ENCODERS = {"csv": encode_csv, "ndjson": encode_ndjson, "columnar": encode_columnar}
+
+
+def export(source, out, fmt="csv", start=None, end=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """把UVLogReader或UVChunk迭代器中[start, end)内的记录写入二进制文件对象out，返回记录数"""
+    if fmt not in ENCODERS:
+        raise ValueError("未知格式: %s (可选: %s)" % (fmt, ", ".join(FORMATS)))
+    if isinstance(source, UVLogReader):
+        chunks = iter_chunks(source, start, end, chunk_size)
+    else:
+        chunks = filter_chunks(source, start, end)
+    counted = _RecordCounter(chunks)
+    for block in ENCODERS[fmt](counted):
+        out.write(block)
+    return counted.records
+
+
+class _RecordCounter:
+    """统计经过的记录数"""
+
+    def __init__(self, chunks):
+        self._chunks = chunks
+        self.records = 0
+
+    def __iter__(self):
+        for chunk in self._chunks:
+            self.records += len(chunk.t)
+            yield chunk
+
+
+def parse_time(text):
+    """Unix时间戳或ISO格式时间(无时区时按本地时间)"""
+    if text is None:
+        return None
+    try:
+        return float(text)
+    except ValueError:
+        return datetime.datetime.fromisoformat(text).timestamp()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="导出记录的紫外线读数")
+    parser.add_argument("source", help="uv_recorder日志目录或列存文件")
+    parser.add_argument("--format", choices=FORMATS, default="csv", help="输出格式(默认csv)")
+    parser.add_argument("--output", default="-", help="输出文件(默认标准输出)，以.gz结尾时gzip压缩")
+    parser.add_argument("--start", help="开始时间(含)，Unix时间戳或ISO格式")
+    parser.add_argument("--end", help="结束时间(不含)，Unix时间戳或ISO格式")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help="每块记录数(默认%d)" % DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args(argv)
+    start, end = parse_time(args.start), parse_time(args.end)
+
+    if args.output == "-":
+        out = sys.stdout.buffer
+    elif args.output.endswith(".gz") and args.format != "columnar":
+        out = gzip.open(args.output, "wb")
+    else:
+        out = open(args.output, "wb")
+    try:
+        if os.path.isdir(args.source):
+            with UVLogReader(args.source) as reader:
+                count = export(reader, out, args.format, start, end, args.chunk_size)
+        else:
+            with open(args.source, "rb") as f:
+                count = export(read_columnar(f), out, args.format, start, end)
+    finally:
+        if out is not sys.stdout.buffer:
+            out.close()
+        else:
+            out.flush()
+    print("导出 %d 条记录" % count, file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
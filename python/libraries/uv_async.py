@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+'''!
+  @file       uv_async.py
+  @brief      紫外线传感器asyncio接口
+  @copyright  Copyright (c) 2021-2026 DFRobot Co.Ltd (http://www.dfrobot.com)
+  @license    The MIT License (MIT)
+  @version    V1.0.0
+  @date       2026-10-17
+
+  使用说明:
+  1. 用AsyncUVSensor包装任意驱动对象(PatchUVSensor、DFRobot_UVIndex240370Sensor_I2C/_UART)
+  2. 在协程中使用:
+     - await sensor.begin() - 初始化传感器
+     - await sensor.read() - 读取一次(raw, index, risk)
+     - async for reading in sensor.stream(rate=2.0): ... - 按固定频率持续读取
+  阻塞的总线读写在线程池中执行，同一总线上的并发访问数由信号量限制，不会阻塞事件循环。
+'''
+
+import asyncio
+import functools
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+
+# 所有AsyncUVSensor共享的线程池
+_executor = None
+
+# 每个事件循环各自的总线信号量 {loop: {bus_key: Semaphore}}
+_bus_semaphores = weakref.WeakKeyDictionary()
+
+
+def _default_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(thread_name_prefix="UVSensorIO")
+    return _executor
+
+
+def _default_bus_key(sensor):
+    """推断传感器所在的物理总线，同一总线上的传感器共享并发限制"""
+    # DFRobot库: ('i2c', 总线号)、('uart', 串口)或注入的总线/主站对象
+    key = getattr(sensor, '_bus_key', None)
+    if isinstance(key, tuple):
+        return key
+    if key is not None:
+        return ('bus', id(key))
+    # PatchUVSensor: begin()找到的总线号
+    bus_index = getattr(sensor, '_bus_index', None)
+    if bus_index is not None:
+        return ('i2c', bus_index)
+    for attr in ('i2cbus', 'master', '_i2c'):
+        handle = getattr(sensor, attr, None)
+        if handle is not None:
+            return (attr, id(handle))
+    return ('sensor', id(sensor))
+
+
+class AsyncUVSensor:
+    """把同步传感器驱动包装为asyncio接口"""
+
+    def __init__(self, sensor, bus_key=None, max_concurrency=1, executor=None):
+        """初始化包装对象
+
+        bus_key: 总线标识，相同标识的传感器共享并发限制；默认根据驱动对象推断
+        max_concurrency: 同一总线上允许同时进行的读写数
+        executor: 执行阻塞读写的线程池，默认使用模块共享线程池
+        """
+        self._sensor = sensor
+        self._bus_key = bus_key
+        self._max_concurrency = max_concurrency
+        self._executor = executor
+
+    @property
+    def sensor(self):
+        return self._sensor
+
+    @property
+    def bus_key(self):
+        if self._bus_key is not None:
+            return self._bus_key
+        return _default_bus_key(self._sensor)
+
+    async def begin(self):
+        """初始化传感器(总线扫描在线程池中执行)"""
+        return await self._run(self._sensor.begin)
+
+    async def read(self):
+        """一次读取原始值、UV指数和风险等级"""
+        return await self._run(self._sensor.read_snapshot)
+
+    async def read_UV_original_data(self):
+        """读取紫外线原始数据"""
+        return await self._run(self._sensor.read_UV_original_data)
+
+    async def read_UV_index_data(self):
+        """读取紫外线指数"""
+        return await self._run(self._sensor.read_UV_index_data)
+
+    async def read_risk_level_data(self):
+        """读取风险等级"""
+        return await self._run(self._sensor.read_risk_level_data)
+
+    async def stream(self, rate=1.0, count=None):
+        """按rate(次/秒)持续产生读数，count为None时无限产生
+
+        以单调时钟计算下次采样时刻，读取耗时不会累积成周期漂移；
+        若读取超时则立即开始下一次采样。
+        """
+        if rate <= 0:
+            raise ValueError("rate必须大于0")
+        loop = asyncio.get_event_loop()
+        period = 1.0 / rate
+        deadline = loop.time()
+        produced = 0
+        while True:
+            yield await self.read()
+            produced += 1
+            if count is not None and produced >= count:
+                break
+            deadline += period
+            delay = deadline - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            else:
+                deadline = loop.time()
+
+    async def _run(self, func, *args):
+        loop = asyncio.get_event_loop()
+        async with self._semaphore(loop):
+            return await loop.run_in_executor(self._executor or _default_executor(),
+                                              functools.partial(func, *args))
+
+    def _semaphore(self, loop):
+        semaphores = _bus_semaphores.setdefault(loop, {})
+        key = self.bus_key
+        semaphore = semaphores.get(key)
+        if semaphore is None:
+            semaphore = semaphores[key] = asyncio.Semaphore(self._max_concurrency)
+        return semaphore
@@ -0,0 +1,253 @@
+# -*- coding: utf-8 -*-
+'''!
+  @file       uv_benchmark.py
+  @brief      紫外线传感器库性能测试
+  @copyright  Copyright (c) 2021-2026 DFRobot Co.Ltd (http://www.dfrobot.com)
+  @license    The MIT License (MIT)
+  @version    V1.0.0
+  @date       2026-10-17
+
+  使用说明:
+  1. 在本目录下运行: python uv_benchmark.py
+  2. 只运行部分测试: python uv_benchmark.py patch conversion
+  3. 输出JSON格式的结果，可保存后在不同版本间比较:
+     python uv_benchmark.py --json > bench.json
+     python uv_benchmark.py --compare bench.json
+
+  所有驱动测试都在uv_transport的假设备上运行，不需要硬件。报告内容:
+  - 每次读取的总线事务数、p50/p99延迟(微秒)、每秒读取次数
+  - read_register_16bit重试路径的耗时
+  - 模块导入时间、原始值转换吞吐量
+  - 内置RTU传输按默认帧间静默(dfrobot_uart_builtin)和帧间静默为0(dfrobot_uart_builtin_no_silence，
+    与modbus_tk时序相同)各测一次，结果中的frame_silence_ms为使用的帧间静默
+'''
+
+import argparse
+import contextlib
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+from uv_drivers import LIB_DIR, import_dfrobot
+
+# 在独立进程中导入模块，测量导入时间并检查是否访问了硬件
+_IMPORT_PROBE = """
+import sys, time
+sys.path.insert(0, %r)
+start = time.perf_counter()
+import unihiker_uv_patch_v3 as m
+elapsed = time.perf_counter() - start
+print(elapsed, int('pinpong.board' in sys.modules), int(m._board is not None))
+"""
+
+
+def bench_import(repeat=10):
+    """测量导入unihiker_uv_patch_v3的时间，并确认导入时没有加载PinPong或初始化Board"""
+    times = []
+    touched_hardware = False
+    for _ in range(repeat):
+        out = subprocess.check_output([sys.executable, "-c", _IMPORT_PROBE % LIB_DIR])
+        elapsed, pinpong_loaded, board_created = out.split()[-3:]
+        times.append(float(elapsed))
+        touched_hardware = touched_hardware or pinpong_loaded == b"1" or board_created == b"1"
+    return {
+        "import_ms_median": statistics.median(times) * 1000,
+        "import_ms_min": min(times) * 1000,
+        "touched_hardware": touched_hardware,
+    }
+
+
+def _percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+def _measure(func, device, count):
+    """调用func count次，统计每次的总线事务数、延迟和吞吐量"""
+    latencies = []
+    transactions = device.transactions
+    start = time.perf_counter()
+    for _ in range(count):
+        t = time.perf_counter()
+        func()
+        latencies.append(time.perf_counter() - t)
+    total = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "transactions_per_reading": (device.transactions - transactions) / count,
+        "p50_us": _percentile(latencies, 0.50) * 1e6,
+        "p99_us": _percentile(latencies, 0.99) * 1e6,
+        "readings_per_second": count / total,
+    }
+
+
+def _measure_apis(sensor, device, apis, count):
+    return {name: _measure(getattr(sensor, name), device, count) for name in apis}
+
+
+READ_APIS = ("read_UV_original_data", "read_UV_index_data", "read_risk_level_data", "read_snapshot")
+
+
+def bench_patch(count=2000):
+    """PatchUVSensor各读取接口的事务数和延迟，以及一次总线错误触发的重试耗时"""
+    from unihiker_uv_patch_v3 import PatchUVSensor, REG_DATA
+    from uv_transport import FakeUVDevice
+    device = FakeUVDevice()
+    device.set_reading(300)
+    sensor = PatchUVSensor(i2c=device, cache_file=None)
+    sensor.begin()
+    results = _measure_apis(sensor, device, READ_APIS, count)
+
+    def read_with_retry():
+        # readfrom_mem和read()回退都失败，进入重试循环
+        device.inject_errors(2)
+        sensor.read_register_16bit(REG_DATA)
+    results["read_register_16bit_retry"] = _measure(read_with_retry, device, 20)
+    return results
+
+
+def bench_dfrobot_i2c(count=2000):
+    """DFRobot_UVIndex240370Sensor_I2C各读取接口的事务数和延迟"""
+    from uv_transport import FakeUVDevice
+    lib = import_dfrobot()
+    device = FakeUVDevice()
+    device.set_reading(300)
+    sensor = lib.DFRobot_UVIndex240370Sensor_I2C(1, i2cbus=device)
+    sensor.begin()
+    return _measure_apis(sensor, device, READ_APIS, count)
+
+
+def bench_dfrobot_uart(count=200, transport="modbus_tk", frame_silence=None):
+    """DFRobot_UVIndex240370Sensor_UART经pty Modbus从机的事务数和延迟
+
+    frame_silence: 内置RTUMaster的帧间静默(秒)，None为按波特率的默认值
+    """
+    from uv_transport import FakeUVDevice, PtyModbusSlave
+    lib = import_dfrobot()
+    device = FakeUVDevice()
+    device.set_reading(300)
+    with PtyModbusSlave({device.addr: device}) as slave:
+        start = time.perf_counter()
+        master = lib.open_rtu_master(slave.port, transport=transport)
+        # 首次打开包括导入modbus_tk或pyserial的时间
+        open_ms = (time.perf_counter() - start) * 1000
+        master.set_timeout(1.0)
+        if frame_silence is not None:
+            master.frame_silence = frame_silence
+        sensor = lib.DFRobot_UVIndex240370Sensor_UART(master=master)
+        sensor.begin()
+        results = _measure_apis(sensor, device, READ_APIS, count)
+    results["open_ms"] = open_ms
+    if transport == "builtin":
+        # 结果中记录使用的帧间静默，便于区分等待时间和每次调用的开销
+        results["frame_silence_ms"] = master.frame_silence * 1000
+    return results
+
+
+def bench_dfrobot_uart_builtin(count=200):
+    """同dfrobot_uart，使用默认设置的内置RTUMaster代替modbus_tk
+
+    内置传输在两帧之间等待3.5个字符时间(9600波特约4ms)，modbus_tk不等待，
+    连续读取时每秒读取次数受帧间静默限制。
+    """
+    return bench_dfrobot_uart(count, transport="builtin")
+
+
+def bench_dfrobot_uart_builtin_no_silence(count=200):
+    """同dfrobot_uart_builtin，帧间静默设为0，与modbus_tk的时序相同，只比较每次调用的开销"""
+    return bench_dfrobot_uart(count, transport="builtin", frame_silence=0)
+
+
+def bench_conversion(count=1000000):
+    """原始值转换为UV指数和风险等级的吞吐量(样本/秒)"""
+    import unihiker_uv_patch_v3 as patch
+    import uv_calibration
+    sensor = patch.PatchUVSensor(simulation_mode=True)
+    raws = [i % 1300 for i in range(count)]
+
+    start = time.perf_counter()
+    for raw in raws[:count // 10]:
+        sensor._get_risk_level(sensor._calculate_uv_index(raw))
+    results = {"scalar_samples_per_second": (count // 10) / (time.perf_counter() - start)}
+
+    numpy_available = uv_calibration.NUMPY_AVAILABLE
+    try:
+        uv_calibration.NUMPY_AVAILABLE = False
+        start = time.perf_counter()
+        patch.convert_uv_batch(raws)
+        results["batch_samples_per_second"] = count / (time.perf_counter() - start)
+    finally:
+        uv_calibration.NUMPY_AVAILABLE = numpy_available
+
+    if numpy_available:
+        np = uv_calibration._load_numpy()
+        array = np.asarray(raws, dtype=np.uint16)
+        start = time.perf_counter()
+        patch.convert_uv_batch(array)
+        results["numpy_samples_per_second"] = count / (time.perf_counter() - start)
+    return results
+
+
+BENCHMARKS = {
+    "import": bench_import,
+    "patch": bench_patch,
+    "dfrobot_i2c": bench_dfrobot_i2c,
+    "dfrobot_uart": bench_dfrobot_uart,
+    "dfrobot_uart_builtin": bench_dfrobot_uart_builtin,
+    "dfrobot_uart_builtin_no_silence": bench_dfrobot_uart_builtin_no_silence,
+    "conversion": bench_conversion,
+}
+
+
+def _flatten(results, prefix=""):
+    flat = {}
+    for key, value in results.items():
+        if isinstance(value, dict):
+            flat.update(_flatten(value, prefix + key + "."))
+        else:
+            flat[prefix + key] = value
+    return flat
+
+
+def _run(name, func):
+    try:
+        return func()
+    except ImportError as e:
+        return {"skipped": str(e)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="紫外线传感器库性能测试")
+    parser.add_argument("names", nargs="*", help="要运行的测试(默认全部): %s" % ", ".join(BENCHMARKS))
+    parser.add_argument("--json", action="store_true", help="输出JSON格式结果")
+    parser.add_argument("--compare", metavar="FILE", help="与之前保存的JSON结果比较")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for name in args.names or BENCHMARKS:
+        if name not in BENCHMARKS:
+            parser.error("未知测试: %s" % name)
+        # 驱动的提示信息输出到stderr，保证stdout只有结果
+        with contextlib.redirect_stdout(sys.stderr):
+            results[name] = _run(name, BENCHMARKS[name])
+
+    if args.json:
+        json.dump(results, sys.stdout, indent=2, sort_keys=True)
+        print()
+        return
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = _flatten(json.load(f))
+    for key, value in sorted(_flatten(results).items()):
+        line = "%-56s %s" % (key, round(value, 3) if isinstance(value, float) else value)
+        old = baseline.get(key)
+        if isinstance(value, (int, float)) and isinstance(old, (int, float)) and old:
+            line += "  (%+.1f%%)" % ((value - old) * 100.0 / old)
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+'''!
+  @file       uv_cache.py
+  @brief      紫外线传感器读数缓存：TTL内复用同一次读数，并发未命中只读取一次总线
+  @copyright  Copyright (c) 2021-2026 DFRobot Co.Ltd (http://www.dfrobot.com)
+  @license    The MIT License (MIT)
+  @version    V1.0.0
+  @date       2026-10-17
+
+  使用说明:
+  1. 包装已创建的传感器: sensor = CachedUVSensor(PatchUVSensor(), ttl=0.05)
+     (也支持DFRobot_UVIndex240370Sensor_I2C / _UART，任何提供read_snapshot()的对象均可)
+  2. 与原传感器用法相同:
+     - sensor.begin()
+     - sensor.read_UV_original_data() / read_UV_index_data() / read_risk_level_data()
+     - sensor.read_snapshot()
+     ttl秒内的调用返回同一次读数；多个线程同时未命中时只有一个线程读取总线，
+     其余线程等待并共用该结果。三个读取接口都取自同一次read_snapshot()，
+     PatchUVSensor的平滑状态每次读取只前进一次。
+  3. sensor.cache_stats() - 命中、未命中和合并等待的次数
+     sensor.invalidate() - 丢弃缓存，下一次调用重新读取
+  其他属性和方法(stats()、set_transaction_hook()等)直接转发给原传感器。
+'''
+
+import threading
+import time
+
+
+class _Flight:
+    """一次正在进行的读取，等待者通过event获取结果"""
+
+    __slots__ = ('event', 'reading', 'error')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.reading = None
+        self.error = None
+
+
+class CachedUVSensor:
+    """带TTL缓存和请求合并的传感器包装"""
+
+    def __init__(self, sensor, ttl=0.05):
+        """初始化缓存，ttl为读数的有效时间(秒)"""
+        if ttl < 0:
+            raise ValueError("ttl不能小于0")
+        self._sensor = sensor
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._reading = None
+        self._expires = 0.0
+        self._flight = None
+        self._cache_stats = {'hits': 0, 'misses': 0, 'coalesced': 0}
+
+    @property
+    def sensor(self):
+        return self._sensor
+
+    def __getattr__(self, name):
+        return getattr(self._sensor, name)
+
+    def read_snapshot(self):
+        """返回ttl内的缓存读数，否则读取一次传感器(并发调用共用同一次读取)"""
+        with self._lock:
+            if self._reading is not None and time.monotonic() < self._expires:
+                self._cache_stats['hits'] += 1
+                return self._reading
+            flight = self._flight
+            leader = flight is None
+            if leader:
+                flight = self._flight = _Flight()
+                self._cache_stats['misses'] += 1
+            else:
+                self._cache_stats['coalesced'] += 1
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.reading
+
+        try:
+            flight.reading = self._sensor.read_snapshot()
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                if flight.error is None:
+                    self._reading = flight.reading
+                    self._expires = time.monotonic() + self.ttl
+                self._flight = None
+            flight.event.set()
+        return flight.reading
+
+    read_all = read_snapshot
+
+    def read_UV_original_data(self):
+        """读取紫外线原始数据(缓存)"""
+        return self.read_snapshot()[0]
+
+    def read_UV_index_data(self):
+        """读取紫外线指数(缓存)"""
+        return self.read_snapshot()[1]
+
+    def read_risk_level_data(self):
+        """读取风险等级(缓存)"""
+        return self.read_snapshot()[2]
+
+    def invalidate(self):
+        """丢弃缓存的读数"""
+        with self._lock:
+            self._reading = None
+
+    def cache_stats(self):
+        """返回{'hits', 'misses', 'coalesced'}计数"""
+        with self._lock:
+            return dict(self._cache_stats)
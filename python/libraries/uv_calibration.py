@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+'''!
+  @file       uv_calibration.py
+  @brief      紫外线传感器校准：断点表编译为0-1200原始值的查找表，两类驱动共用
+  @copyright  Copyright (c) 2021-2026 DFRobot Co.Ltd (http://www.dfrobot.com)
+  @license    The MIT License (MIT)
+  @version    V1.0.0
+  @date       2026-10-17
+
+  使用说明:
+  1. 默认校准(官方维基断点表): DEFAULT_CALIBRATION
+  2. 单个传感器的校准文件(JSON):
+     {"name": "unit-17", "index_breakpoints": [52, 230, 320, 410, 505, 608, 698, 797, 883, 978, 1081]}
+     cal = load_calibration("unit-17.json")      # 未给出risk_breakpoints时使用默认风险等级表
+     cal.save("unit-17.json")                    # 保存当前断点表，可作为新文件的模板
+  3. 用于驱动:
+     - PatchUVSensor(calibration=cal) 或 PatchUVSensor(calibration="unit-17.json")
+     - DFRobot_UVIndex240370Sensor_I2C(1, calibration=cal) - 在主机端由原始值换算，
+       read_UV_index_data()/read_risk_level_data()/read_snapshot()不再读取寄存器0x07/0x08
+  4. 换算:
+     - cal.index(raw) / cal.risk(index) / cal.convert(raw) -> (index, risk)
+     - cal.convert_batch(raw_values) - 批量换算，NumPy可用时向量化查表
+
+  断点表含义: 原始值 >= 第i个断点时UV指数至少为i+1；UV指数 >= 第i个风险断点时风险等级至少为i+1。
+  构造时一次编译为bytes查找表index_lut/risk_lut(长度max_raw+1)，单次换算只是一次下标访问；
+  超过max_raw的原始值按max_raw换算，负值按0换算。
+'''
+
+import importlib.util
+from array import array
+from bisect import bisect_right
+
+MAX_RAW = 1200
+# 官方维基校准: https://wiki.dfrobot.com.cn/SKU_SEN0636_Gravity:240370紫外线指数传感器
+DEFAULT_INDEX_BREAKPOINTS = (50, 227, 318, 408, 503, 606, 696, 795, 881, 976, 1079)
+# 0-2低风险，3-5中等风险，6-7高风险，8-10非常高风险，11+极端风险
+DEFAULT_RISK_BREAKPOINTS = (3, 6, 8, 11)
+
+# NumPy为可选依赖，仅用于批量换算，首次调用convert_batch()时才导入
+NUMPY_AVAILABLE = importlib.util.find_spec("numpy") is not None
+np = None
+
+
+def _load_numpy():
+    global np
+    if np is None:
+        import numpy
+        np = numpy
+    return np
+
+
+def _check_breakpoints(name, breakpoints):
+    breakpoints = tuple(int(b) for b in breakpoints)
+    if len(breakpoints) > 255:
+        raise ValueError("%s过长" % name)
+    if any(a >= b for a, b in zip(breakpoints, breakpoints[1:])):
+        raise ValueError("%s必须严格递增: %r" % (name, breakpoints))
+    return breakpoints
+
+
+class UVCalibration:
+    """编译后的校准表"""
+
+    def __init__(self, index_breakpoints=DEFAULT_INDEX_BREAKPOINTS,
+                 risk_breakpoints=DEFAULT_RISK_BREAKPOINTS, max_raw=MAX_RAW, name="wiki"):
+        """由断点表编译查找表"""
+        self.name = name
+        self.max_raw = max_raw
+        self.index_breakpoints = _check_breakpoints("index_breakpoints", index_breakpoints)
+        self.risk_breakpoints = _check_breakpoints("risk_breakpoints", risk_breakpoints)
+        # 原始值 -> UV指数、UV指数 -> 风险等级、原始值 -> 风险等级
+        self.index_lut = bytes(bisect_right(self.index_breakpoints, raw) for raw in range(max_raw + 1))
+        self.risk_by_index = bytes(bisect_right(self.risk_breakpoints, index) for index in range(256))
+        self.risk_lut = self.index_lut.translate(self.risk_by_index)
+        self._np_index_lut = None
+        self._np_risk_lut = None
+
+    def index(self, raw):
+        """原始值 -> UV指数"""
+        return self.index_lut[min(self.max_raw, max(0, raw))]
+
+    def risk(self, index):
+        """UV指数 -> 风险等级"""
+        return self.risk_by_index[min(255, max(0, index))]
+
+    def risk_from_raw(self, raw):
+        """原始值 -> 风险等级"""
+        return self.risk_lut[min(self.max_raw, max(0, raw))]
+
+    def convert(self, raw):
+        """原始值 -> (UV指数, 风险等级)"""
+        if raw > self.max_raw:
+            raw = self.max_raw
+        elif raw < 0:
+            raw = 0
+        return self.index_lut[raw], self.risk_lut[raw]
+
+    def convert_batch(self, raw_values):
+        """批量换算，返回(index, risk)
+
+        raw_values可以是NumPy数组、array、memoryview或任意可迭代对象。
+        NumPy可用时返回uint8数组；否则返回array('B')。
+        """
+        if NUMPY_AVAILABLE:
+            np = _load_numpy()
+            if self._np_index_lut is None:
+                self._np_index_lut = np.frombuffer(self.index_lut, dtype=np.uint8)
+                self._np_risk_lut = np.frombuffer(self.risk_lut, dtype=np.uint8)
+            raw = np.clip(np.asarray(raw_values), 0, self.max_raw).astype(np.intp, copy=False)
+            return self._np_index_lut[raw], self._np_risk_lut[raw]
+
+        index_lut, risk_lut, max_raw = self.index_lut, self.risk_lut, self.max_raw
+        raws = [min(max_raw, max(0, raw)) for raw in raw_values]
+        return array('B', [index_lut[raw] for raw in raws]), array('B', [risk_lut[raw] for raw in raws])
+
+    def as_dict(self):
+        return {
+            "name": self.name,
+            "index_breakpoints": list(self.index_breakpoints),
+            "risk_breakpoints": list(self.risk_breakpoints),
+            "max_raw": self.max_raw,
+        }
+
+    @classmethod
+    def load(cls, path):
+        """从JSON校准文件加载"""
+        import json
+        with open(path) as f:
+            data = json.load(f)
+        try:
+            return cls(data["index_breakpoints"],
+                       data.get("risk_breakpoints", DEFAULT_RISK_BREAKPOINTS),
+                       data.get("max_raw", MAX_RAW),
+                       data.get("name", path))
+        except (KeyError, TypeError) as e:
+            raise ValueError("校准文件格式错误: %s (%s)" % (path, e))
+
+    def save(self, path):
+        """保存为JSON校准文件"""
+        import json
+        with open(path, "w") as f:
+            json.dump(self.as_dict(), f, indent=2)
+
+    def __repr__(self):
+        return "UVCalibration(%r)" % self.name
+
+
+DEFAULT_CALIBRATION = UVCalibration()
+
+
+def load_calibration(calibration=None):
+    """返回UVCalibration: None为默认校准，字符串为校准文件路径，其他对象原样返回"""
+    if calibration is None:
+        return DEFAULT_CALIBRATION
+    if isinstance(calibration, str):
+        return UVCalibration.load(calibration)
+    return calibration
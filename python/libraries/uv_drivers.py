@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+'''!
+  @file       uv_drivers.py
+  @brief      按名称创建紫外线传感器驱动，供命令行工具共用
+  @copyright  Copyright (c) 2021-2026 DFRobot Co.Ltd (http://www.dfrobot.com)
+  @license    The MIT License (MIT)
+  @version    V1.0.0
+  @date       2026-10-17
+
+  使用说明:
+  1. sensor = open_sensor("patch")                          # 行空板PinPong补丁，自动查找总线
+     sensor = open_sensor("i2c", bus=1)                     # DFRobot库，I2C
+     sensor = open_sensor("uart", port="/dev/ttyUSB0", addr=0x23, baud=9600)
+     sensor = open_sensor("uart", port="/dev/ttyUSB0", baud=115200, transport="builtin")   # 不需要modbus_tk
+     sensor = open_sensor("patch", bus=4, addr=0x23)          # 指定总线和地址，不自动查找
+     sensor = open_sensor("patch", simulate=True)           # 模拟数据，不需要硬件
+  2. 命令行工具: add_driver_arguments(parser)，解析后 sensor_from_args(args)
+'''
+
+import os
+import sys
+
+LIB_DIR = os.path.dirname(os.path.abspath(__file__))
+# DFRobot_UVIndex240370Sensor库在仓库中的位置
+DFROBOT_LIB_DIR = os.path.join(LIB_DIR, "..", "..", "arduinoC", "libraries",
+                               "DFRobot_UVIndex240370Sensor", "python")
+
+DRIVERS = ("patch", "i2c", "uart")
+TRANSPORTS = ("modbus_tk", "builtin")
+
+
+def import_dfrobot():
+    """导入DFRobot_UVIndex240370Sensor库"""
+    if DFROBOT_LIB_DIR not in sys.path:
+        sys.path.append(DFROBOT_LIB_DIR)
+    import DFRobot_UVIndex240370Sensor
+    return DFRobot_UVIndex240370Sensor
+
+
+def open_sensor(driver="patch", bus=None, port="/dev/ttyAMA0", addr=0x23, baud=9600,
+                simulate=False, begin=True, transport="modbus_tk"):
+    """创建传感器驱动
+
+    driver: "patch"(PatchUVSensor)、"i2c"或"uart"(DFRobot库)
+    bus: I2C总线号，i2c默认1，patch默认自动查找
+    addr: I2C地址(patch/i2c)或Modbus从机地址(uart)
+    simulate: 只对patch有效，使用模拟数据
+    transport: 只对uart有效，"modbus_tk"或"builtin"(库内置的RTU主站，只需要pyserial)
+    begin: 是否调用begin()，初始化失败时抛出RuntimeError
+    """
+    if driver == "patch":
+        from unihiker_uv_patch_v3 import PatchUVSensor
+        sensor = PatchUVSensor(simulation_mode=simulate, bus=bus, addr=addr)
+    elif driver == "i2c":
+        sensor = import_dfrobot().DFRobot_UVIndex240370Sensor_I2C(1 if bus is None else bus)
+        sensor._addr = addr
+    elif driver == "uart":
+        sensor = import_dfrobot().DFRobot_UVIndex240370Sensor_UART(addr=addr, port=port, baud=baud,
+                                                                  transport=transport)
+    else:
+        raise ValueError("未知驱动: %s (可选: %s)" % (driver, ", ".join(DRIVERS)))
+    if begin and sensor.begin() is False:
+        raise RuntimeError("传感器初始化失败: %s" % driver)
+    return sensor
+
+
+def add_driver_arguments(parser):
+    """添加选择驱动的命令行参数"""
+    parser.add_argument("--driver", choices=DRIVERS, default="patch", help="传感器驱动(默认patch)")
+    parser.add_argument("--bus", type=int, help="I2C总线号(i2c驱动默认1，patch驱动默认自动查找)")
+    parser.add_argument("--port", default="/dev/ttyAMA0", help="串口设备(uart驱动)")
+    parser.add_argument("--addr", type=lambda s: int(s, 0), default=0x23, help="I2C地址或Modbus从机地址")
+    parser.add_argument("--baud", type=int, default=9600, help="波特率(uart驱动)")
+    parser.add_argument("--transport", choices=TRANSPORTS, default="modbus_tk", help="Modbus RTU实现(uart驱动)")
+    parser.add_argument("--simulate", action="store_true", help="使用模拟数据(patch驱动)")
+
+
+def sensor_from_args(args):
+    return open_sensor(args.driver, bus=args.bus, port=args.port, addr=args.addr,
+                       baud=args.baud, simulate=args.simulate, transport=args.transport)
@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+'''!
+  @file       uv_events.py
+  @brief      紫外线读数的变化事件：只在读数有意义地变化时通知订阅者
+  @copyright  Copyright (c) 2021-2026 DFRobot Co.Ltd (http://www.dfrobot.com)
+  @license    The MIT License (MIT)
+  @version    V1.0.0
+  @date       2026-10-17
+
+  使用说明:
+  1. 包装传感器: events = UVEventSource(sensor, raw_deadband=10, risk_hysteresis=1)
+  2. 订阅事件: events.subscribe(EVENT_RISK, lambda e: print(e.old, "->", e.new))
+     事件类型: EVENT_RAW(原始值超出死区)、EVENT_INDEX(UV指数变化)、EVENT_RISK(风险等级变化)，
+     EVENT_ANY订阅所有事件；回调参数为UVEvent(kind, timestamp, old, new, reading)
+  3. 产生读数:
+     - 自己的循环中调用 events.poll()
+     - 或交给后台采样线程: UVSampler(events, rate=2.0).start()
+       (UVEventSource提供read_snapshot()，读取传感器的同时分发事件)
+     - 已有读数时直接调用 events.update(reading)
+
+  风险等级由UV指数按RISK_BOUNDARIES计算: 指数达到边界时立即升级，
+  指数低于边界减risk_hysteresis时才降级，避免在边界附近来回跳变。
+'''
+
+import time
+from bisect import bisect_right
+from collections import namedtuple
+
+from uv_calibration import DEFAULT_RISK_BREAKPOINTS
+
+EVENT_RAW = 'raw'
+EVENT_INDEX = 'index'
+EVENT_RISK = 'risk'
+EVENT_ANY = '*'
+EVENT_KINDS = (EVENT_RAW, EVENT_INDEX, EVENT_RISK)
+
+# 风险等级边界(UV指数)，与read_risk_level_data()的默认分级相同
+RISK_BOUNDARIES = DEFAULT_RISK_BREAKPOINTS
+
+# timestamp为time.time()时间；第一次读数时old为None
+UVEvent = namedtuple('UVEvent', ['kind', 'timestamp', 'old', 'new', 'reading'])
+
+
+class UVEventSource:
+    """按例外报告：比较每次读数与上次报告的值，只在超出死区或跨越边界时通知订阅者"""
+
+    def __init__(self, sensor=None, raw_deadband=10, risk_hysteresis=1, risk_boundaries=RISK_BOUNDARIES):
+        """初始化事件源
+
+        sensor: 提供read_snapshot()的传感器，只调用update()时可为None
+        raw_deadband: 原始值相对上次报告值的变化达到该值才产生EVENT_RAW
+        risk_hysteresis: 风险等级降级所需低于边界的UV指数差值
+        """
+        self._sensor = sensor
+        self.raw_deadband = raw_deadband
+        self.risk_hysteresis = risk_hysteresis
+        self._boundaries = tuple(risk_boundaries)
+        self._subscribers = {kind: [] for kind in EVENT_KINDS + (EVENT_ANY,)}
+        self._raw = None
+        self._index = None
+        self._risk = None
+        self.events = 0     # 已产生的事件数
+        self.errors = 0     # 回调抛出异常的次数
+        self.last_error = None
+
+    def subscribe(self, kind, callback):
+        """订阅事件，返回callback以便取消订阅"""
+        if kind not in self._subscribers:
+            raise ValueError("未知事件类型: %s" % kind)
+        self._subscribers[kind].append(callback)
+        return callback
+
+    def unsubscribe(self, kind, callback):
+        try:
+            self._subscribers[kind].remove(callback)
+        except (KeyError, ValueError):
+            pass
+
+    @property
+    def raw(self):
+        """上次报告的原始值"""
+        return self._raw
+
+    @property
+    def index(self):
+        """上次报告的UV指数"""
+        return self._index
+
+    @property
+    def risk(self):
+        """当前(经过滞回的)风险等级"""
+        return self._risk
+
+    def read_snapshot(self):
+        """读取传感器并分发事件，返回读数本身，可作为UVSampler的传感器使用"""
+        reading = self._sensor.read_snapshot()
+        self.update(reading)
+        return reading
+
+    def poll(self):
+        """读取一次传感器，返回本次产生的事件列表"""
+        return self.update(self._sensor.read_snapshot())
+
+    def update(self, reading, timestamp=None):
+        """处理一次读数(raw, index, risk)，返回本次产生的事件列表"""
+        if timestamp is None:
+            timestamp = time.time()
+        raw, index = reading[0], reading[1]
+        emitted = []
+        if self._raw is None or abs(raw - self._raw) >= self.raw_deadband:
+            emitted.append(UVEvent(EVENT_RAW, timestamp, self._raw, raw, reading))
+            self._raw = raw
+        if index != self._index:
+            emitted.append(UVEvent(EVENT_INDEX, timestamp, self._index, index, reading))
+            self._index = index
+        risk = self._risk_level(index)
+        if risk != self._risk:
+            emitted.append(UVEvent(EVENT_RISK, timestamp, self._risk, risk, reading))
+            self._risk = risk
+        for event in emitted:
+            self._dispatch(event)
+        return emitted
+
+    def reset(self):
+        """清除上次报告的值，下一次读数会重新产生所有事件"""
+        self._raw = self._index = self._risk = None
+
+    def _risk_level(self, index):
+        level = bisect_right(self._boundaries, index)
+        current = self._risk
+        if current is None or level >= current:
+            return level
+        # 降级: 只有低于当前等级下边界减滞回量时才降到对应等级
+        while current > level and index < self._boundaries[current - 1] - self.risk_hysteresis:
+            current -= 1
+        return current
+
+    def _dispatch(self, event):
+        self.events += 1
+        for callback in self._subscribers[event.kind] + self._subscribers[EVENT_ANY]:
+            try:
+                callback(event)
+            except Exception as e:
+                self.errors += 1
+                self.last_error = e
@@ -0,0 +1,239 @@
+# -*- coding: utf-8 -*-
+'''!
+  @file       uv_exporter.py
+  @brief      紫外线传感器HTTP指标导出(Prometheus文本格式和JSON)
+  @copyright  Copyright (c) 2021-2026 DFRobot Co.Ltd (http://www.dfrobot.com)
+  @license    The MIT License (MIT)
+  @version    V1.0.0
+  @date       2026-10-17
+
+  使用说明:
+  1. 命令行运行(在本目录下):
+     python -m uv_exporter --listen 0.0.0.0:9240 --rate 1
+     python -m uv_exporter --simulate                 # 模拟数据，不需要硬件
+     python -m uv_exporter --driver uart --port /dev/ttyUSB0 --addr 0x23
+  2. 访问:
+     - http://<地址>:9240/metrics - Prometheus文本格式
+     - http://<地址>:9240/json    - JSON格式
+  3. 在程序中使用: exporter = UVExporter(sensor, rate=1.0); exporter.serve(("", 9240))
+
+  总线只由后台采样线程(UVSampler)按rate访问，HTTP请求只读取缓存的最新读数和驱动统计，
+  抓取频率不影响总线负载。同一次采样期间的并发请求共用一次渲染结果。
+'''
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from uv_drivers import add_driver_arguments, sensor_from_args
+from uv_sampler import UVSampler
+
+DEFAULT_PORT = 9240
+CONTENT_TYPES = {
+    "prometheus": "text/plain; version=0.0.4; charset=utf-8",
+    "json": "application/json",
+}
+PATHS = {"/metrics": "prometheus", "/json": "json"}
+
+
+class UVExporter:
+    """后台采样并把最新读数和驱动统计渲染为Prometheus文本或JSON"""
+
+    def __init__(self, sensor, rate=1.0, sampler=None):
+        """初始化导出器
+
+        sensor: 已初始化的传感器(PatchUVSensor或DFRobot驱动)
+        rate: 采样频率(次/秒)，与抓取频率无关
+        sampler: 已有的UVSampler，提供时不再创建采样线程
+        """
+        self._sensor = sensor
+        self._own_sampler = sampler is None
+        self._sampler = sampler or UVSampler(sensor, rate=rate, capacity=1)
+        self._lock = threading.Lock()
+        self._cache = {}
+        self.renders = 0    # 实际渲染次数
+        self.requests = 0   # 处理的请求数
+        self._server = None
+        self._server_lock = threading.Lock()
+
+    def start(self):
+        if self._own_sampler:
+            self._sampler.start()
+        return self
+
+    def stop(self):
+        """停止HTTP服务和自己创建的采样线程，可从其他线程调用，重复调用无影响"""
+        with self._server_lock:
+            server, self._server = self._server, None
+            if server is not None:
+                server.shutdown()
+                server.server_close()
+            if self._own_sampler:
+                self._sampler.stop()
+
+    def render(self, fmt="prometheus"):
+        """返回渲染后的响应内容(bytes)
+
+        缓存以采样线程的读数/错误计数为版本，版本不变时复用上次的快照和渲染结果；
+        并发请求在锁上等待同一次渲染。读数时间(age)每次请求重新计算，
+        采样线程阻塞在读取中时也能看出读数变旧。
+        """
+        sampler = self._sampler
+        with self._lock:
+            self.requests += 1
+            version = (sampler.samples, sampler.errors)
+            cached = self._cache.get(fmt)
+            if cached is None or cached[0] != version:
+                snapshot = self._snapshot()
+                body = None if fmt == "json" else _render_prometheus(snapshot)
+                cached = self._cache[fmt] = (version, snapshot, body)
+                self.renders += 1
+        _, snapshot, body = cached
+        reading = snapshot["reading"]
+        age = None if reading is None else time.monotonic() - reading["timestamp"]
+        if fmt == "json":
+            return _render_json(snapshot, age)
+        return body + _render_age(age)
+
+    def _snapshot(self):
+        sampler = self._sampler
+        latest = sampler.latest()
+        stats = getattr(self._sensor, 'stats', None)
+        return {
+            "reading": None if latest is None else {
+                "raw": latest.raw,
+                "index": latest.index,
+                "risk": latest.risk,
+                "timestamp": latest.timestamp,
+            },
+            "sampler": {"samples": sampler.samples, "errors": sampler.errors,
+                        "last_error": None if sampler.last_error is None else str(sampler.last_error)},
+            "simulated": bool(getattr(self._sensor, '_simulation_mode', False)),
+            "stats": stats() if stats else {},
+        }
+
+    def serve(self, address=("", DEFAULT_PORT)):
+        """启动采样并在address上提供HTTP服务，阻塞直到stop()或Ctrl+C"""
+        self.start()
+        server = ThreadingHTTPServer(address, _make_handler(self))
+        server.daemon_threads = True
+        with self._server_lock:
+            self._server = server
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+
+def _make_handler(exporter):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            fmt = PATHS.get(self.path.split("?", 1)[0])
+            if fmt is None:
+                self.send_error(404)
+                return
+            body = exporter.render(fmt)
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPES[fmt])
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+    return Handler
+
+
+def _render_json(snapshot, age):
+    stats = dict(snapshot["stats"])
+    # JSON的键必须是字符串
+    for key in ("transactions", "errors", "latency_histogram_us"):
+        if key in stats:
+            stats[key] = {("inf" if k is None else str(k)): v for k, v in stats[key].items()}
+    reading = snapshot["reading"]
+    if reading is not None:
+        # 单调时钟时间戳只在进程内有意义，输出读数距今的秒数
+        reading = {key: value for key, value in reading.items() if key != "timestamp"}
+        reading["age_seconds"] = age
+    return json.dumps(dict(snapshot, reading=reading, stats=stats), sort_keys=True).encode()
+
+
+def _render_age(age):
+    if age is None:
+        return b""
+    return ("# HELP uv_reading_age_seconds Seconds since the cached reading was taken\n"
+            "# TYPE uv_reading_age_seconds gauge\n"
+            "uv_reading_age_seconds %.3f\n" % age).encode()
+
+
+def _render_prometheus(snapshot):
+    lines = []
+
+    def metric(name, kind, help_text, samples):
+        lines.append("# HELP %s %s" % (name, help_text))
+        lines.append("# TYPE %s %s" % (name, kind))
+        for labels, value in samples:
+            lines.append("%s%s %s" % (name, labels, value))
+
+    reading = snapshot["reading"]
+    if reading is not None:
+        metric("uv_raw", "gauge", "Raw UV sensor value", [("", reading["raw"])])
+        metric("uv_index", "gauge", "UV index (0-11)", [("", reading["index"])])
+        metric("uv_risk_level", "gauge", "UV risk level (0-4)", [("", reading["risk"])])
+    sampler = snapshot["sampler"]
+    metric("uv_samples_total", "counter", "Successful background samples", [("", sampler["samples"])])
+    metric("uv_sample_errors_total", "counter", "Failed background samples", [("", sampler["errors"])])
+    metric("uv_simulated", "gauge", "1 if the driver returns simulated data",
+           [("", int(snapshot["simulated"]))])
+
+    stats = snapshot["stats"]
+    for key, name, help_text in (("transactions", "uv_bus_transactions_total", "Bus transactions per register"),
+                                 ("errors", "uv_bus_errors_total", "Failed bus transactions per register")):
+        if key in stats:
+            metric(name, "counter", help_text,
+                   [('{register="0x%02x"}' % reg, count) for reg, count in sorted(stats[key].items())])
+    for key in ("retries", "byte_swaps", "clamps", "fallbacks"):
+        if key in stats:
+            metric("uv_%s_total" % key, "counter", "Driver %s" % key.replace("_", " "), [("", stats[key])])
+    histogram = stats.get("latency_histogram_us")
+    if histogram:
+        samples = []
+        total = 0
+        for bound, count in histogram.items():
+            total += count
+            le = "+Inf" if bound is None else "%g" % (bound / 1e6)
+            samples.append(('{le="%s"}' % le, total))
+        lines.append("# HELP uv_bus_latency_seconds Bus transaction latency")
+        lines.append("# TYPE uv_bus_latency_seconds histogram")
+        lines.extend("uv_bus_latency_seconds_bucket%s %s" % sample for sample in samples)
+        if "latency_sum_us" in stats:
+            lines.append("uv_bus_latency_seconds_sum %.6f" % (stats["latency_sum_us"] / 1e6))
+        lines.append("uv_bus_latency_seconds_count %s" % total)
+    return ("\n".join(lines) + "\n").encode()
+
+
+def _parse_listen(value):
+    host, _, port = value.rpartition(":")
+    return host, int(port)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="紫外线传感器HTTP指标导出")
+    add_driver_arguments(parser)
+    parser.add_argument("--listen", type=_parse_listen, default=("", DEFAULT_PORT),
+                        help="监听地址 [主机]:端口 (默认 :%d)" % DEFAULT_PORT)
+    parser.add_argument("--rate", type=float, default=1.0, help="采样频率(次/秒，默认1)")
+    args = parser.parse_args(argv)
+
+    exporter = UVExporter(sensor_from_args(args), rate=args.rate)
+    host, port = args.listen
+    print("UV exporter: http://%s:%d/metrics" % (host or "0.0.0.0", port))
+    exporter.serve(args.listen)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,319 @@
+# -*- coding: utf-8 -*-
+'''!
+  @file       uv_fleet.py
+  @brief      多传感器采集进程：按物理总线分配工作进程，合并为按时间排序的输出流
+  @copyright  Copyright (c) 2021-2026 DFRobot Co.Ltd (http://www.dfrobot.com)
+  @license    The MIT License (MIT)
+  @version    V1.0.0
+  @date       2026-10-17
+
+  使用说明:
+  1. 编写配置文件(JSON)，每个传感器一项:
+     {
+       "sensors": [
+         {"name": "roof",  "driver": "i2c",  "bus": 1, "addr": 35, "rate": 2},
+         {"name": "mast1", "driver": "uart", "port": "/dev/ttyUSB0", "addr": 35, "baud": 9600, "rate": 1},
+         {"name": "mast2", "driver": "uart", "port": "/dev/ttyUSB0", "addr": 36, "baud": 9600, "rate": 1},
+         {"name": "board", "driver": "patch", "rate": 1}
+       ]
+     }
+     driver/bus/port/addr/baud/simulate/transport与uv_drivers.open_sensor()的参数相同，rate为每秒采样次数，
+     name默认为"驱动:总线或串口:地址"；uart传感器可用timeout设置该从机的应答超时(秒，默认0.2)，
+     同一串口上的baud和transport必须相同。patch传感器可用bus指定总线(默认自动查找)，
+     同一总线上的多个patch传感器须用不同的addr。
+  2. 运行(在本目录下):
+     python -m uv_fleet fleet.json                        # NDJSON输出到标准输出
+     python -m uv_fleet fleet.json --format csv --output readings.csv --duration 3600
+  3. 每行输出一次读数: t(time.time()), sensor, raw, index, risk；
+     读取失败时输出 t, sensor, error。
+
+  同一条I2C总线或同一个串口上的传感器由同一个工作进程按各自的采样时刻轮流读取，
+  同一串口上的从机共用一个RTUBus(只打开一次串口)，
+  不同总线在不同进程中并行，吞吐量随总线数量增加，不受单个Python进程和GIL限制。
+  主进程把各进程的结果放入按时间排序的缓冲区，超过reorder_window秒的记录按时间顺序输出。
+'''
+
+import argparse
+import contextlib
+import csv
+import functools
+import heapq
+import json
+import multiprocessing
+import queue
+import sys
+import time
+
+FORMATS = ("ndjson", "csv")
+CSV_FIELDS = ("t", "sensor", "raw", "index", "risk", "error")
+DEFAULT_REORDER_WINDOW = 0.5    # 等待较慢进程的时间(秒)，在此之前的记录才按顺序输出
+BATCH_INTERVAL = 0.1            # 工作进程向主进程发送结果的最长间隔(秒)
+
+
+def load_config(path):
+    """读取配置文件，返回补全了name和rate的传感器列表"""
+    with open(path) as f:
+        config = json.load(f)
+    sensors = config.get("sensors") if isinstance(config, dict) else config
+    if not sensors:
+        raise ValueError("配置文件中没有传感器: %s" % path)
+    names = set()
+    patch_sensors = set()
+    for spec in sensors:
+        spec.setdefault("driver", "patch")
+        spec.setdefault("rate", 1.0)
+        if spec["rate"] <= 0:
+            raise ValueError("rate必须大于0: %r" % spec)
+        spec.setdefault("name", _default_name(spec))
+        if spec["name"] in names:
+            raise ValueError("传感器名称重复: %s" % spec["name"])
+        names.add(spec["name"])
+        if spec["driver"] == "patch" and not spec.get("simulate"):
+            # 总线和地址都相同的两项读取的是同一个传感器
+            where = (spec.get("bus"), spec.get("addr", 0x23))
+            if where in patch_sensors:
+                raise ValueError("patch传感器的bus和addr重复: %s" % spec["name"])
+            patch_sensors.add(where)
+    return sensors
+
+
+def _default_name(spec):
+    driver = spec["driver"]
+    if driver == "i2c":
+        where = spec.get("bus", 1)
+    elif driver == "uart":
+        where = spec.get("port", "/dev/ttyAMA0")
+    else:
+        where = spec.get("bus", "auto")
+    return "%s:%s:0x%02x" % (driver, where, spec.get("addr", 0x23))
+
+
+def bus_key(spec):
+    """传感器所在的物理总线，同一总线上的传感器由同一个工作进程读取"""
+    driver = spec["driver"]
+    if driver == "i2c":
+        return "i2c:%s" % spec.get("bus", 1)
+    if driver == "uart":
+        return "uart:%s" % spec.get("port", "/dev/ttyAMA0")
+    if driver == "patch" and spec.get("simulate"):
+        # 模拟传感器不访问总线，各自一个进程
+        return "sim:%s" % spec["name"]
+    # PatchUVSensor自动查找总线，同一进程内共用PinPong Board对象
+    return driver
+
+
+def shard(sensors):
+    """按物理总线分组，返回{总线: [传感器配置]}"""
+    shards = {}
+    for spec in sensors:
+        shards.setdefault(bus_key(spec), []).append(spec)
+    return shards
+
+
+def _open(spec):
+    from uv_drivers import open_sensor
+    options = {key: spec[key] for key in ("bus", "port", "addr", "baud", "simulate", "transport") if key in spec}
+    return open_sensor(spec["driver"], **options)
+
+
+def _open_rtu_bus(specs):
+    """同一串口上的所有从机共用一个DFRobot_UVIndex240370Sensor_RTUBus(一个串口、一个主站)
+
+    返回({名称: 读取函数}, [(名称, 错误)])，每个从机按自己的timeout读取
+    """
+    from uv_drivers import import_dfrobot
+    first = specs[0]
+    for key in ("baud", "transport"):
+        values = set(spec.get(key) for spec in specs)
+        if len(values) > 1:
+            raise ValueError("串口%s上的%s不一致: %s" % (first.get("port", "/dev/ttyAMA0"), key, sorted(map(str, values))))
+    bus = import_dfrobot().DFRobot_UVIndex240370Sensor_RTUBus(
+        addrs=(), port=first.get("port", "/dev/ttyAMA0"), baud=first.get("baud", 9600),
+        transport=first.get("transport", "modbus_tk"))
+    for spec in specs:
+        bus.add_slave(spec.get("addr", 0x23), spec.get("timeout"))
+    status = bus.begin()
+    readers = {}
+    failures = []
+    for spec in specs:
+        addr = spec.get("addr", 0x23)
+        if status.get(addr):
+            readers[spec["name"]] = functools.partial(bus.read, addr)
+        else:
+            failures.append((spec["name"], "从机0x%02x无应答或PID不匹配" % addr))
+    return readers, failures
+
+
+def _open_shard(key, specs):
+    """打开一个分片的传感器，返回({名称: 读取函数}, [(名称, 错误)])"""
+    if key.startswith("uart:"):
+        try:
+            return _open_rtu_bus(specs)
+        except Exception as e:
+            return {}, [(spec["name"], str(e)) for spec in specs]
+    readers = {}
+    failures = []
+    for spec in specs:
+        try:
+            readers[spec["name"]] = _open(spec).read_snapshot
+        except Exception as e:
+            failures.append((spec["name"], str(e)))
+    return readers, failures
+
+
+def _worker(key, specs, results, stop):
+    """工作进程: 按各传感器的采样时刻读取，批量发送(t, name, raw, index, risk, error)"""
+    # 标准输出留给主进程的NDJSON/CSV，驱动的提示信息输出到stderr
+    with contextlib.redirect_stdout(sys.stderr):
+        _sample_shard(key, specs, results, stop)
+    results.put(key)    # 本进程结束
+
+
+def _sample_shard(key, specs, results, stop):
+    readers, failures = _open_shard(key, specs)
+    batch = [(time.time(), name, None, None, None, "初始化失败: %s" % error) for name, error in failures]
+    due = []
+    now = time.monotonic()
+    for i, spec in enumerate(specs):
+        if spec["name"] in readers:
+            heapq.heappush(due, (now, i, spec["name"], 1.0 / spec["rate"]))
+
+    try:
+        _run_shard(readers, due, batch, results, stop)
+    except KeyboardInterrupt:
+        # Ctrl+C由主进程处理
+        pass
+
+
+def _run_shard(readers, due, batch, results, stop):
+    last_send = time.monotonic()
+    while due and not stop.is_set():
+        deadline, i, name, period = due[0]
+        delay = deadline - time.monotonic()
+        if delay > 0:
+            if batch and time.monotonic() - last_send >= BATCH_INTERVAL:
+                results.put(batch)
+                batch = []
+                last_send = time.monotonic()
+            stop.wait(min(delay, BATCH_INTERVAL))
+            continue
+        try:
+            raw, index, risk = readers[name]()
+            batch.append((time.time(), name, raw, index, risk, None))
+        except Exception as e:
+            batch.append((time.time(), name, None, None, None, str(e)))
+        deadline += period
+        if deadline < time.monotonic():
+            # 读取跟不上采样频率，跳过错过的采样时刻
+            deadline = time.monotonic()
+        heapq.heapreplace(due, (deadline, i, name, period))
+    if batch:
+        results.put(batch)
+
+
+class FleetCollector:
+    """启动工作进程并按时间顺序产生所有传感器的记录"""
+
+    def __init__(self, sensors, reorder_window=DEFAULT_REORDER_WINDOW):
+        """sensors为load_config()返回的传感器配置列表"""
+        self.shards = shard(sensors)
+        self.reorder_window = reorder_window
+        self._context = multiprocessing.get_context()
+        self._results = self._context.Queue()
+        self._stop = self._context.Event()
+        self._processes = []
+        self.records = 0
+        self.errors = 0
+
+    def start(self):
+        for key, specs in self.shards.items():
+            process = self._context.Process(target=_worker, args=(key, specs, self._results, self._stop),
+                                            name="uv-fleet-%s" % key, daemon=True)
+            process.start()
+            self._processes.append(process)
+        return self
+
+    def stop(self):
+        """通知工作进程结束，stream()输出剩余记录后返回"""
+        self._stop.set()
+
+    def stream(self, duration=None):
+        """产生(t, sensor, raw, index, risk, error)，按t排序；duration秒后或所有进程结束后停止"""
+        end = None if duration is None else time.monotonic() + duration
+        pending = []
+        sequence = 0    # 时间戳相同时按到达顺序输出
+        running = len(self._processes)
+        while running:
+            if end is not None and time.monotonic() >= end:
+                self.stop()
+            try:
+                item = self._results.get(timeout=0.1)
+            except queue.Empty:
+                item = None
+                if not any(process.is_alive() for process in self._processes):
+                    break
+            if isinstance(item, str):
+                running -= 1
+            elif item:
+                for record in item:
+                    heapq.heappush(pending, (record[0], sequence, record))
+                    sequence += 1
+            horizon = time.time() - self.reorder_window
+            while pending and pending[0][0] <= horizon:
+                yield self._count(heapq.heappop(pending)[2])
+        while pending:
+            yield self._count(heapq.heappop(pending)[2])
+        for process in self._processes:
+            process.join(1.0)
+
+    def _count(self, record):
+        self.records += 1
+        if record[5] is not None:
+            self.errors += 1
+        return record
+
+
+def _write_ndjson(out, record):
+    t, name, raw, index, risk, error = record
+    data = {"t": round(t, 6), "sensor": name}
+    if error is None:
+        data.update(raw=raw, index=index, risk=risk)
+    else:
+        data["error"] = error
+    out.write(json.dumps(data, ensure_ascii=False) + "\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="多传感器采集")
+    parser.add_argument("config", help="传感器配置文件(JSON)")
+    parser.add_argument("--format", choices=FORMATS, default="ndjson", help="输出格式(默认ndjson)")
+    parser.add_argument("--output", default="-", help="输出文件(默认标准输出)")
+    parser.add_argument("--duration", type=float, help="采集时长(秒)，默认一直运行")
+    parser.add_argument("--reorder-window", type=float, default=DEFAULT_REORDER_WINDOW,
+                        help="排序等待时间(秒，默认%.1f)" % DEFAULT_REORDER_WINDOW)
+    args = parser.parse_args(argv)
+
+    collector = FleetCollector(load_config(args.config), reorder_window=args.reorder_window)
+    out = sys.stdout if args.output == "-" else open(args.output, "a", newline="")
+    writer = csv.writer(out) if args.format == "csv" else None
+    if writer is not None and (out is sys.stdout or out.tell() == 0):
+        writer.writerow(CSV_FIELDS)
+    print("采集 %d 条总线: %s" % (len(collector.shards), ", ".join(collector.shards)), file=sys.stderr)
+    collector.start()
+    try:
+        for record in collector.stream(args.duration):
+            if writer is not None:
+                writer.writerow(record)
+            else:
+                _write_ndjson(out, record)
+            out.flush()
+    except KeyboardInterrupt:
+        collector.stop()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print("记录 %d 条，错误 %d 条" % (collector.records, collector.errors), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
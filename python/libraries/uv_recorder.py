@@ -0,0 +1,344 @@
+# -*- coding: utf-8 -*-
+'''!
+  @file       uv_recorder.py
+  @brief      紫外线读数的紧凑二进制时间序列日志(追加写入、按大小分段、mmap读取)
+  @copyright  Copyright (c) 2021-2026 DFRobot Co.Ltd (http://www.dfrobot.com)
+  @license    The MIT License (MIT)
+  @version    V1.0.0
+  @date       2026-10-17
+
+  使用说明:
+  1. 记录:
+     with UVLogWriter("/home/uvlog") as log:
+         while True:
+             log.record(sensor)         # 读取一次传感器并追加一条记录
+  2. 读取:
+     reader = UVLogReader("/home/uvlog")
+     data = reader.read(start=time.time() - 3600)   # 最近一小时
+     NumPy可用时返回结构化数组(字段: timestamp, raw, index, risk, flags)，
+     单个分段内的数据直接映射文件内容，不复制；否则返回UVLogRecord列表。
+  3. 批量导出为CSV/NDJSON/压缩列存文件: python -m uv_archive /home/uvlog --format csv --output uv.csv
+
+  文件格式: 每个分段文件以16字节文件头开始(魔数、版本、记录长度、墙上时间偏移)，
+  之后是16字节定长记录<dHBBHxx>: 单调时钟时间戳、原始值、UV指数、风险等级、质量标志。
+'''
+
+import mmap
+import os
+import struct
+import time
+from bisect import bisect_left
+from collections import namedtuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+MAGIC = b"UVLG"
+VERSION = 1
+HEADER = struct.Struct("<4sHHd")     # 魔数、版本、记录长度、墙上时间偏移(time.time() - time.monotonic())
+RECORD = struct.Struct("<dHBBHxx")   # 时间戳(单调时钟)、原始值、UV指数、风险等级、质量标志
+SEGMENT_PREFIX = "uv-"
+SEGMENT_SUFFIX = ".seg"
+
+# 质量标志
+FLAG_SIMULATED = 0x01       # 模拟数据
+FLAG_RETRIED = 0x02         # 读取时发生了重试
+FLAG_BYTE_SWAPPED = 0x04    # 读数经过字节序修正
+FLAG_CLAMPED = 0x08         # 读数被限幅
+# 0x10保留: 旧版补丁(V3.1.9之前)把1024替换为上次值或默认值时设置，旧日志中仍可能出现
+FLAG_RESERVED_SUBSTITUTED = 0x10
+FLAG_FALLBACK = 0x20        # 读取失败，使用了上次有效值
+FLAG_BUS_ERROR = 0x40       # 读取过程中出现总线错误
+
+_STAT_FLAGS = (
+    ('retries', FLAG_RETRIED),
+    ('byte_swaps', FLAG_BYTE_SWAPPED),
+    ('clamps', FLAG_CLAMPED),
+    ('fallbacks', FLAG_FALLBACK),
+)
+
+if np is not None:
+    RECORD_DTYPE = np.dtype([("timestamp", "<f8"), ("raw", "<u2"), ("index", "u1"),
+                             ("risk", "u1"), ("flags", "<u2"), ("_pad", "V2")])
+
+UVLogRecord = namedtuple('UVLogRecord', ['timestamp', 'raw', 'index', 'risk', 'flags'])
+
+
+def quality_flags(before, after):
+    """根据读取前后的sensor.stats()计算质量标志"""
+    flags = 0
+    for key, flag in _STAT_FLAGS:
+        if after.get(key, 0) != before.get(key, 0):
+            flags |= flag
+    if sum(after.get('errors', {}).values()) != sum(before.get('errors', {}).values()):
+        flags |= FLAG_BUS_ERROR
+    return flags
+
+
+class UVLogWriter:
+    """追加写入定长记录，分段文件超过max_segment_bytes后切换到新文件"""
+
+    def __init__(self, directory, max_segment_bytes=4 * 1024 * 1024, flush_every=1):
+        """初始化日志，flush_every为每写入多少条记录刷新一次文件缓冲"""
+        self.directory = directory
+        self.max_segment_bytes = max(max_segment_bytes, HEADER.size + RECORD.size)
+        self.flush_every = flush_every
+        os.makedirs(directory, exist_ok=True)
+        existing = segment_paths(directory)
+        self._sequence = _segment_number(existing[-1]) + 1 if existing else 1
+        self._file = None
+        self._size = 0
+        self._pending = 0
+
+    def append(self, timestamp, raw, index, risk, flags=0):
+        """追加一条记录，timestamp为time.monotonic()时间"""
+        if self._file is None or self._size + RECORD.size > self.max_segment_bytes:
+            self._open_segment()
+        self._file.write(RECORD.pack(timestamp, raw, index, risk, flags))
+        self._size += RECORD.size
+        self._pending += 1
+        if self._pending >= self.flush_every:
+            self.flush()
+
+    def record(self, sensor):
+        """读取一次传感器(read_snapshot)并追加记录，质量标志由读取前后的stats()得到"""
+        stats = getattr(sensor, 'stats', None)
+        before = stats() if stats else {}
+        raw, index, risk = sensor.read_snapshot()
+        timestamp = time.monotonic()
+        flags = quality_flags(before, stats()) if stats else 0
+        if getattr(sensor, '_simulation_mode', False):
+            flags |= FLAG_SIMULATED
+        self.append(timestamp, raw, index, risk, flags)
+        return UVLogRecord(timestamp, raw, index, risk, flags)
+
+    def flush(self):
+        if self._file is not None:
+            self._file.flush()
+        self._pending = 0
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _open_segment(self):
+        self.close()
+        path = os.path.join(self.directory, "%s%06d%s" % (SEGMENT_PREFIX, self._sequence, SEGMENT_SUFFIX))
+        self._sequence += 1
+        self._file = open(path, "ab")
+        self._file.write(HEADER.pack(MAGIC, VERSION, RECORD.size, time.time() - time.monotonic()))
+        self._size = HEADER.size
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+UVLogSegmentHeader = namedtuple('UVLogSegmentHeader',
+                                ['path', 'wall_offset', 'count', 'first_timestamp', 'last_timestamp'])
+
+
+def read_segment_header(path):
+    """读取分段的文件头、记录数和首尾时间戳(单调时钟)，不映射文件"""
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        wall_offset = _unpack_header(f.read(HEADER.size), path)
+        # 忽略写入中断留下的不完整记录
+        count = (size - HEADER.size) // RECORD.size
+        if not count:
+            return UVLogSegmentHeader(path, wall_offset, 0, None, None)
+        first = RECORD.unpack(f.read(RECORD.size))[0]
+        f.seek(HEADER.size + (count - 1) * RECORD.size)
+        last = RECORD.unpack(f.read(RECORD.size))[0]
+    return UVLogSegmentHeader(path, wall_offset, count, first, last)
+
+
+def _unpack_header(data, path):
+    """校验文件头，返回墙上时间偏移"""
+    if len(data) < HEADER.size:
+        raise ValueError("分段文件不完整: %s" % path)
+    magic, version, record_size, wall_offset = HEADER.unpack_from(data, 0)
+    if magic != MAGIC or version != VERSION or record_size != RECORD.size:
+        raise ValueError("不支持的分段文件: %s" % path)
+    return wall_offset
+
+
+class UVLogSegment:
+    """一个通过mmap映射的分段文件"""
+
+    def __init__(self, path, count=None):
+        """映射分段文件，count为只读取的记录数(默认为文件中的全部完整记录)"""
+        self.path = path
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < HEADER.size:
+                raise ValueError("分段文件不完整: %s" % path)
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self.wall_offset = _unpack_header(self._mmap, path)
+        except ValueError:
+            self._mmap.close()
+            raise
+        # 忽略写入中断留下的不完整记录
+        complete = (size - HEADER.size) // RECORD.size
+        self.count = complete if count is None else min(count, complete)
+
+    def __len__(self):
+        return self.count
+
+    def timestamp(self, i):
+        """第i条记录的单调时钟时间戳"""
+        return RECORD.unpack_from(self._mmap, HEADER.size + i * RECORD.size)[0]
+
+    def locate(self, timestamp):
+        """第一条时间戳不小于timestamp(单调时钟)的记录序号"""
+        return bisect_left(_TimestampView(self), timestamp)
+
+    def memoryview(self, first=0, last=None):
+        """[first, last)记录的原始字节，不复制"""
+        last = self.count if last is None else last
+        return memoryview(self._mmap)[HEADER.size + first * RECORD.size:HEADER.size + last * RECORD.size]
+
+    def array(self, first=0, last=None):
+        """[first, last)记录的NumPy结构化数组，直接映射文件内容"""
+        last = self.count if last is None else last
+        return np.frombuffer(self._mmap, dtype=RECORD_DTYPE, count=last - first,
+                             offset=HEADER.size + first * RECORD.size)
+
+    def records(self, first=0, last=None):
+        """逐条解码[first, last)记录"""
+        for fields in RECORD.iter_unpack(self.memoryview(first, last)):
+            yield UVLogRecord(*fields)
+
+    def close(self):
+        try:
+            self._mmap.close()
+        except BufferError:
+            # 仍有数组引用映射内容，等引用释放后由垃圾回收关闭
+            pass
+
+
+class _TimestampView:
+    """把分段的时间戳列暴露为序列，供bisect使用"""
+
+    def __init__(self, segment):
+        self._segment = segment
+
+    def __len__(self):
+        return len(self._segment)
+
+    def __getitem__(self, i):
+        return self._segment.timestamp(i)
+
+
+class UVLogReader:
+    """读取目录下的所有分段文件，按墙上时间(time.time())查询
+
+    打开时只读取各分段的文件头和首尾时间戳，查询时才逐个映射用到的分段，用完即关闭，
+    打开的文件数与分段数量无关。
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.segments = []
+        for path in segment_paths(directory):
+            try:
+                header = read_segment_header(path)
+            except ValueError:
+                continue
+            if header.count:
+                self.segments.append(header)
+
+    def __len__(self):
+        return sum(header.count for header in self.segments)
+
+    def ranges(self, start=None, end=None):
+        """产生(segment, first, last)，覆盖墙上时间[start, end)内的记录
+
+        segment在产生下一项(或迭代结束)时关闭，需要在此之前使用它的数据
+        """
+        for header in self.segments:
+            # 按文件头中的首尾时间跳过不相交的分段，不映射文件
+            if start is not None and header.last_timestamp + header.wall_offset < start:
+                continue
+            if end is not None and header.first_timestamp + header.wall_offset >= end:
+                continue
+            segment = UVLogSegment(header.path, header.count)
+            try:
+                first = 0 if start is None else segment.locate(start - segment.wall_offset)
+                last = len(segment) if end is None else segment.locate(end - segment.wall_offset)
+                if first < last:
+                    yield segment, first, last
+            finally:
+                segment.close()
+
+    def views(self, start=None, end=None):
+        """按分段产生[start, end)内记录的零拷贝视图(NumPy数组或memoryview)
+
+        视图引用分段的映射，释放视图后映射才关闭；同时保留大量分段的视图时请复制数据
+        """
+        for segment, first, last in self.ranges(start, end):
+            yield segment.array(first, last) if np is not None else segment.memoryview(first, last)
+
+    def read(self, start=None, end=None):
+        """读取[start, end)内的记录
+
+        NumPy可用时返回结构化数组，只有一个分段时不复制数据；时间戳字段仍为单调时钟，
+        可用wall_time()换算。NumPy不可用时返回UVLogRecord列表。
+        """
+        if np is None:
+            return [record for segment, first, last in self.ranges(start, end)
+                    for record in segment.records(first, last)]
+        arrays = []
+        for view in self.views(start, end):
+            # 跨多个分段时复制各分段的数据，读过的分段随即关闭
+            if len(arrays) == 1:
+                arrays[0] = arrays[0].copy()
+            arrays.append(view.copy() if arrays else view)
+        if not arrays:
+            return np.empty(0, dtype=RECORD_DTYPE)
+        return arrays[0] if len(arrays) == 1 else np.concatenate(arrays)
+
+    def wall_time(self, start=None, end=None):
+        """[start, end)内记录的墙上时间"""
+        times = []
+        for segment, first, last in self.ranges(start, end):
+            if np is not None:
+                times.append(segment.array(first, last)["timestamp"] + segment.wall_offset)
+            else:
+                times.extend(record.timestamp + segment.wall_offset
+                             for record in segment.records(first, last))
+        if np is None:
+            return times
+        return np.concatenate(times) if times else np.empty(0)
+
+    def close(self):
+        self.segments = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def segment_paths(directory):
+    """目录下按序号排列的分段文件路径"""
+    if not os.path.isdir(directory):
+        return []
+    names = [name for name in os.listdir(directory)
+             if name.startswith(SEGMENT_PREFIX) and name.endswith(SEGMENT_SUFFIX)]
+    return [os.path.join(directory, name) for name in sorted(names, key=_segment_number)]
+
+
+def _segment_number(path):
+    name = os.path.basename(path)
+    try:
+        return int(name[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)])
+    except ValueError:
+        return 0
@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+'''!
+  @file       uv_rollup.py
+  @brief      紫外线读数的在线汇总：每分钟/每小时统计和当日累计红斑剂量
+  @copyright  Copyright (c) 2021-2026 DFRobot Co.Ltd (http://www.dfrobot.com)
+  @license    The MIT License (MIT)
+  @version    V1.0.0
+  @date       2026-10-17
+
+  使用说明:
+  1. 创建汇总对象: rollup = UVRollup()
+  2. 每次读数后调用: rollup.add(sensor.read_snapshot())
+  3. 随时查询(不扫描历史读数):
+     - rollup.current_minute() / rollup.current_hour() - 当前分钟/小时的统计
+     - rollup.minutes() / rollup.hours() - 最近完成的分钟/小时统计
+     - rollup.last_hour_max() - 最近一小时UV指数最大值
+     - rollup.dose_today() - 当日累计红斑剂量(J/m²)，rollup.dose_today_sed()为SED
+
+  红斑剂量按UV指数换算辐照度: 1 UV指数 = 0.025 W/m² 红斑加权辐照度，相邻读数之间按梯形积分；
+  两次读数间隔超过max_gap秒时不积分，避免传感器离线时用旧读数累计剂量。
+'''
+
+import time
+from collections import deque
+
+# 1 UV指数对应的红斑加权辐照度(W/m²)
+UV_INDEX_IRRADIANCE = 0.025
+# 1个标准红斑剂量(SED)为100 J/m²
+SED = 100.0
+
+
+class UVWindow:
+    """一个时间窗口内原始值和UV指数的最小值、最大值、总和和读数个数"""
+
+    __slots__ = ('start', 'length', 'count', 'raw_min', 'raw_max', 'raw_sum',
+                 'index_min', 'index_max', 'index_sum')
+
+    def __init__(self, start, length):
+        self.start = start
+        self.length = length
+        self.count = 0
+        self.raw_min = self.raw_max = None
+        self.index_min = self.index_max = None
+        self.raw_sum = 0
+        self.index_sum = 0
+
+    def add(self, raw, index):
+        if self.count == 0:
+            self.raw_min = self.raw_max = raw
+            self.index_min = self.index_max = index
+        else:
+            if raw < self.raw_min:
+                self.raw_min = raw
+            elif raw > self.raw_max:
+                self.raw_max = raw
+            if index < self.index_min:
+                self.index_min = index
+            elif index > self.index_max:
+                self.index_max = index
+        self.raw_sum += raw
+        self.index_sum += index
+        self.count += 1
+
+    @property
+    def end(self):
+        return self.start + self.length
+
+    @property
+    def raw_mean(self):
+        return self.raw_sum / self.count if self.count else None
+
+    @property
+    def index_mean(self):
+        return self.index_sum / self.count if self.count else None
+
+    def as_dict(self):
+        return {
+            'start': self.start, 'end': self.end, 'count': self.count,
+            'raw_min': self.raw_min, 'raw_max': self.raw_max, 'raw_mean': self.raw_mean,
+            'index_min': self.index_min, 'index_max': self.index_max, 'index_mean': self.index_mean,
+        }
+
+    def __repr__(self):
+        return "UVWindow(%r)" % self.as_dict()
+
+
+class _WindowSeries:
+    """固定长度的窗口序列：当前窗口加最近history个已完成窗口"""
+
+    def __init__(self, length, history):
+        self.length = length
+        self.completed = deque(maxlen=history)
+        self.current = None
+
+    def add(self, timestamp, raw, index):
+        start = timestamp - timestamp % self.length
+        if self.current is None or start != self.current.start:
+            if self.current is not None and self.current.count:
+                self.completed.append(self.current)
+            self.current = UVWindow(start, self.length)
+        self.current.add(raw, index)
+
+
+class UVRollup:
+    """在线汇总读数，内存占用只与保留的窗口数有关"""
+
+    def __init__(self, minute_history=60, hour_history=24, max_gap=300.0):
+        """初始化汇总
+
+        minute_history/hour_history: 保留的已完成分钟/小时窗口个数
+        max_gap: 剂量积分允许的最大读数间隔(秒)
+        """
+        self._minutes = _WindowSeries(60, minute_history)
+        self._hours = _WindowSeries(3600, hour_history)
+        self.max_gap = max_gap
+        self._day = None
+        self._dose = 0.0
+        self._last_time = None
+        self._last_irradiance = None
+
+    def add(self, reading, timestamp=None):
+        """加入一次读数
+
+        reading: read_snapshot()的结果、uv_sampler.UVSample或(raw, index, risk)元组
+        timestamp: 读数的墙上时间(time.time())，默认为当前时间
+        """
+        if hasattr(reading, 'raw'):
+            raw, index = reading.raw, reading.index
+        else:
+            raw, index = reading[0], reading[1]
+        if timestamp is None:
+            timestamp = time.time()
+        self._minutes.add(timestamp, raw, index)
+        self._hours.add(timestamp, raw, index)
+        self._integrate(timestamp, index)
+
+    def _integrate(self, timestamp, index):
+        day = time.localtime(timestamp)[:3]
+        if day != self._day:
+            self._day = day
+            self._dose = 0.0
+            self._last_time = None
+        irradiance = index * UV_INDEX_IRRADIANCE
+        if self._last_time is not None:
+            gap = timestamp - self._last_time
+            if 0 < gap <= self.max_gap:
+                self._dose += (irradiance + self._last_irradiance) * 0.5 * gap
+        self._last_time = timestamp
+        self._last_irradiance = irradiance
+
+    def current_minute(self):
+        return self._minutes.current
+
+    def current_hour(self):
+        return self._hours.current
+
+    def minutes(self):
+        """最近完成的分钟窗口(按时间先后)"""
+        return list(self._minutes.completed)
+
+    def hours(self):
+        """最近完成的小时窗口(按时间先后)"""
+        return list(self._hours.completed)
+
+    def last_hour_max(self, now=None):
+        """最近一小时的UV指数最大值，没有读数时返回None"""
+        if now is None:
+            now = time.time()
+        windows = list(self._minutes.completed)
+        if self._minutes.current is not None:
+            windows.append(self._minutes.current)
+        values = [w.index_max for w in windows if w.end > now - 3600 and w.count]
+        return max(values) if values else None
+
+    def dose_today(self):
+        """当日累计红斑剂量(J/m²)"""
+        if self._day != time.localtime()[:3]:
+            return 0.0
+        return self._dose
+
+    def dose_today_sed(self):
+        """当日累计红斑剂量(SED)"""
+        return self.dose_today() / SED
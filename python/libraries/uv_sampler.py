@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+'''!
+  @file       uv_sampler.py
+  @brief      紫外线传感器后台采样线程和环形缓冲区
+  @copyright  Copyright (c) 2021-2026 DFRobot Co.Ltd (http://www.dfrobot.com)
+  @license    The MIT License (MIT)
+  @version    V1.0.0
+  @date       2026-10-17
+
+  使用说明:
+  1. 创建并初始化传感器: sensor = PatchUVSensor(); sensor.begin()
+     (也支持DFRobot_UVIndex240370Sensor_I2C / _UART，任何提供read_snapshot()的对象均可)
+  2. 启动后台采样: sampler = UVSampler(sensor, rate=2.0, capacity=3600); sampler.start()
+  3. 读取数据(不访问总线):
+     - sampler.latest() - 最新一次读数
+     - sampler.window(60) - 最近60秒内的读数
+  4. 停止采样: sampler.stop()
+'''
+
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from collections import namedtuple
+
+from uv_scheduler import DeadlineScheduler
+
+# 带时间戳的读数，timestamp为time.monotonic()时间
+UVSample = namedtuple('UVSample', ['timestamp', 'raw', 'index', 'risk'])
+
+
+class UVRingBuffer:
+    """固定容量的环形缓冲区，使用array存储各列，内存占用固定"""
+
+    def __init__(self, capacity=3600):
+        """初始化缓冲区，capacity为最多保存的读数个数"""
+        if capacity <= 0:
+            raise ValueError("capacity必须大于0")
+        self._capacity = capacity
+        self._timestamps = array('d', bytes(8 * capacity))
+        self._raw = array('l', bytes(array('l').itemsize * capacity))
+        self._index = array('B', bytes(capacity))
+        self._risk = array('B', bytes(capacity))
+        self._next = 0      # 下一个写入位置
+        self._count = 0     # 有效读数个数
+        self._lock = threading.Lock()
+
+    @property
+    def capacity(self):
+        return self._capacity
+
+    def __len__(self):
+        return self._count
+
+    def append(self, timestamp, raw, index, risk):
+        """追加一条读数，缓冲区满时覆盖最早的读数"""
+        with self._lock:
+            pos = self._next
+            self._timestamps[pos] = timestamp
+            self._raw[pos] = raw
+            self._index[pos] = index
+            self._risk[pos] = risk
+            self._next = (pos + 1) % self._capacity
+            if self._count < self._capacity:
+                self._count += 1
+
+    def latest(self):
+        """返回最新一条读数，缓冲区为空时返回None"""
+        with self._lock:
+            if not self._count:
+                return None
+            return self._sample((self._next - 1) % self._capacity)
+
+    def window(self, seconds, now=None):
+        """返回最近seconds秒内的读数列表(按时间先后排列)"""
+        if now is None:
+            now = time.monotonic()
+        with self._lock:
+            start = (self._next - self._count) % self._capacity
+            # 时间戳在环内单调递增，二分查找窗口起点
+            lo = bisect_left(_RingView(self._timestamps, start, self._count), now - seconds)
+            return [self._sample((start + i) % self._capacity) for i in range(lo, self._count)]
+
+    def clear(self):
+        """清空缓冲区"""
+        with self._lock:
+            self._next = 0
+            self._count = 0
+
+    def _sample(self, pos):
+        return UVSample(self._timestamps[pos], self._raw[pos], self._index[pos], self._risk[pos])
+
+
+class _RingView:
+    """把环形数组的有效区间按时间顺序暴露为序列，供bisect使用"""
+
+    def __init__(self, data, start, count):
+        self._data = data
+        self._start = start
+        self._count = count
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, i):
+        return self._data[(self._start + i) % len(self._data)]
+
+
+class UVSampler:
+    """后台采样线程：按固定频率读取传感器，并把读数写入环形缓冲区"""
+
+    def __init__(self, sensor, rate=1.0, capacity=3600):
+        """初始化采样器，rate为每秒采样次数，capacity为缓冲区容量"""
+        self._sensor = sensor
+        self._buffer = UVRingBuffer(capacity)
+        self._thread = None
+        self._stop_event = threading.Event()
+        # 按单调时钟截止时间定频采样，读取超时时跳过错过的采样时刻
+        self._scheduler = DeadlineScheduler(rate, sleep=self._stop_event.wait)
+        self.samples = 0    # 成功读取次数
+        self.errors = 0     # 读取失败次数
+        self.last_error = None
+
+    @property
+    def buffer(self):
+        return self._buffer
+
+    @property
+    def scheduler(self):
+        """采样调度器，scheduler.stats()为抖动和超时统计"""
+        return self._scheduler
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """启动后台采样线程"""
+        if self.running:
+            return self
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="UVSampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        """停止后台采样线程"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def latest(self):
+        """最新一次读数(不访问总线)"""
+        return self._buffer.latest()
+
+    def window(self, seconds):
+        """最近seconds秒内的读数(不访问总线)"""
+        return self._buffer.window(seconds)
+
+    def sample_once(self):
+        """立即读取一次传感器并写入缓冲区"""
+        raw, index, risk = self._sensor.read_snapshot()
+        self._buffer.append(time.monotonic(), raw, index, risk)
+        self.samples += 1
+
+    def _run(self):
+        for _ in self._scheduler.ticks(stop=self._stop_event):
+            try:
+                self.sample_once()
+            except Exception as e:
+                self.errors += 1
+                self.last_error = e
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+'''!
+  @file       uv_scheduler.py
+  @brief      按单调时钟截止时间精确定频采样，记录抖动和超时统计；命令行采样入口
+  @copyright  Copyright (c) 2021-2026 DFRobot Co.Ltd (http://www.dfrobot.com)
+  @license    The MIT License (MIT)
+  @version    V1.0.0
+  @date       2026-10-17
+
+  使用说明:
+  1. 命令行(在本目录下)，取代示例中的 while True: ... time.sleep(1) 循环:
+     python -m uv_scheduler --rate 2 --duration 60
+     python -m uv_scheduler --simulate --rate 10 --format ndjson --stats
+     python -m uv_scheduler --driver uart --port /dev/ttyUSB0 --rate 1 --format csv > uv.csv
+  2. 在程序中使用:
+     scheduler = DeadlineScheduler(rate=2.0, policy=SKIP)
+     for scheduled in scheduler.ticks(duration=60):
+         reading = sensor.read_snapshot()
+     print(scheduler.stats())
+
+  第n次采样的截止时间为 开始时间 + n/rate，与每次读取的耗时无关，长期运行不会漂移。
+  某次采样开始时已落后一个周期以上时记为一次超时(overrun)，按policy处理:
+  - SKIP: 跳过错过的采样时刻，从下一个未到的时刻继续(保持原有相位)
+  - CATCH_UP: 立即连续补做错过的采样，max_catch_up限制最多补做的个数
+'''
+
+import argparse
+import contextlib
+import json
+import math
+import sys
+import time
+
+SKIP = 'skip'
+CATCH_UP = 'catch_up'
+POLICIES = (SKIP, CATCH_UP)
+
+FORMATS = ("text", "csv", "ndjson")
+RISK_NAMES = ("低", "中等", "高", "很高", "极高")
+
+
+class DeadlineScheduler:
+    """以单调时钟截止时间产生采样时刻"""
+
+    def __init__(self, rate, policy=SKIP, max_catch_up=None, clock=time.monotonic, sleep=time.sleep):
+        """初始化调度器
+
+        rate: 每秒采样次数
+        policy: SKIP或CATCH_UP
+        max_catch_up: CATCH_UP时最多补做的采样数，None表示全部补做
+        sleep: 等待函数，可传入threading.Event().wait以便随时停止
+        """
+        if rate <= 0:
+            raise ValueError("rate必须大于0")
+        if policy not in POLICIES:
+            raise ValueError("未知策略: %s (可选: %s)" % (policy, ", ".join(POLICIES)))
+        self.period = 1.0 / rate
+        self.policy = policy
+        self.max_catch_up = max_catch_up
+        self._clock = clock
+        self._sleep = sleep
+        self.reset_stats()
+
+    def reset_stats(self):
+        self._ticks = 0
+        self._overruns = 0
+        self._skipped = 0
+        self._jitter_sum = 0.0
+        self._jitter_sq_sum = 0.0
+        self._jitter_max = 0.0
+
+    def stats(self):
+        """返回统计数据
+
+        ticks: 已产生的采样时刻数; overruns: 落后一个周期以上才开始的采样数
+        skipped: 被跳过的采样时刻数; jitter_*_us: 实际开始时间晚于截止时间的量(微秒)
+        """
+        n = self._ticks
+        mean = self._jitter_sum / n if n else 0.0
+        variance = max(0.0, self._jitter_sq_sum / n - mean * mean) if n else 0.0
+        return {
+            'ticks': n,
+            'overruns': self._overruns,
+            'skipped': self._skipped,
+            'jitter_mean_us': mean * 1e6,
+            'jitter_std_us': math.sqrt(variance) * 1e6,
+            'jitter_max_us': self._jitter_max * 1e6,
+        }
+
+    def ticks(self, count=None, duration=None, stop=None):
+        """产生采样时刻(单调时钟截止时间)，调用方在两次迭代之间完成采样
+
+        count: 最多产生的次数; duration: 运行时长(秒); stop: 提供is_set()的对象，置位后停止
+        """
+        clock = self._clock
+        period = self.period
+        start = clock()
+        # 第k次采样的截止时间为start + k*period，不累加浮点误差
+        k = 0
+        deadline = start
+        end = None if duration is None else start + duration
+        produced = 0
+        while count is None or produced < count:
+            if end is not None and deadline >= end:
+                return
+            delay = deadline - clock()
+            if delay > 0:
+                self._sleep(delay)
+            if stop is not None and stop.is_set():
+                return
+            now = clock()
+            lateness = now - deadline
+            if lateness >= period:
+                self._overruns += 1
+                missed = int(lateness // period)
+                if self.policy == SKIP:
+                    skip = missed
+                elif self.max_catch_up is not None:
+                    skip = max(0, missed - self.max_catch_up)
+                else:
+                    skip = 0
+                if skip:
+                    self._skipped += skip
+                    k += skip
+                    deadline = start + k * period
+                    lateness = now - deadline
+                    if end is not None and deadline >= end:
+                        return
+            self._record(max(0.0, lateness))
+            yield deadline
+            produced += 1
+            k += 1
+            deadline = start + k * period
+
+    def run(self, func, count=None, duration=None, stop=None):
+        """在每个采样时刻调用func(deadline)"""
+        for deadline in self.ticks(count, duration, stop):
+            func(deadline)
+
+    def _record(self, lateness):
+        self._ticks += 1
+        self._jitter_sum += lateness
+        self._jitter_sq_sum += lateness * lateness
+        if lateness > self._jitter_max:
+            self._jitter_max = lateness
+
+
+def _risk_name(risk):
+    return RISK_NAMES[risk] if 0 <= risk < len(RISK_NAMES) else str(risk)
+
+
+def main(argv=None):
+    from uv_drivers import add_driver_arguments, sensor_from_args
+
+    parser = argparse.ArgumentParser(description="紫外线传感器定频采样")
+    add_driver_arguments(parser)
+    parser.add_argument("--rate", type=float, default=1.0, help="采样频率(次/秒，默认1)")
+    parser.add_argument("--duration", type=float, help="采样时长(秒)，默认一直运行")
+    parser.add_argument("--count", type=int, help="采样次数")
+    parser.add_argument("--format", choices=FORMATS, default="text", help="输出格式(默认text)")
+    parser.add_argument("--policy", choices=POLICIES, default=SKIP, help="采样落后时的处理策略(默认skip)")
+    parser.add_argument("--stats", action="store_true", help="结束时在标准错误输出调度统计")
+    args = parser.parse_args(argv)
+
+    # 驱动的提示信息输出到stderr，保证stdout只有采样结果(可直接重定向为CSV/NDJSON文件)
+    out = sys.stdout
+    with contextlib.redirect_stdout(sys.stderr):
+        sensor = sensor_from_args(args)
+        scheduler = DeadlineScheduler(args.rate, policy=args.policy)
+        errors = _sample(sensor, scheduler, args, out)
+    if args.stats:
+        stats = dict(scheduler.stats(), read_errors=errors)
+        print(json.dumps(stats, sort_keys=True), file=sys.stderr)
+
+
+def _sample(sensor, scheduler, args, out):
+    """按调度器的采样时刻读取并写入out，返回读取失败次数"""
+    if args.format == "csv":
+        out.write("t,raw,index,risk\n")
+    errors = 0
+    try:
+        for _ in scheduler.ticks(args.count, args.duration):
+            try:
+                raw, index, risk = sensor.read_snapshot()
+            except Exception as e:
+                errors += 1
+                print("读取失败: %s" % e, file=sys.stderr)
+                continue
+            t = time.time()
+            if args.format == "csv":
+                out.write("%.6f,%d,%d,%d\n" % (t, raw, index, risk))
+            elif args.format == "ndjson":
+                out.write(json.dumps({"t": round(t, 6), "raw": raw, "index": index, "risk": risk}) + "\n")
+            else:
+                out.write("%s  原始值: %4d  UV指数: %2d  风险等级: %d (%s)\n"
+                          % (time.strftime("%H:%M:%S"), raw, index, risk, _risk_name(risk)))
+            out.flush()
+    except KeyboardInterrupt:
+        pass
+    return errors
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,297 @@
+# -*- coding: utf-8 -*-
+'''!
+  @file       uv_transport.py
+  @brief      紫外线传感器无硬件总线后端：寄存器表假设备、pty Modbus RTU从机、录制/回放
+  @copyright  Copyright (c) 2021-2026 DFRobot Co.Ltd (http://www.dfrobot.com)
+  @license    The MIT License (MIT)
+  @version    V1.0.0
+  @date       2026-10-17
+
+  使用说明:
+  1. 寄存器表假设备，可直接注入两类驱动:
+     device = FakeUVDevice(); device.set_reading(512)
+     - PatchUVSensor(i2c=device)
+     - DFRobot_UVIndex240370Sensor_I2C(1, i2cbus=device)
+     - DFRobot_UVIndex240370Sensor_UART(master=device)
+  2. pty上的Modbus RTU从机，用真实串口代码测试UART驱动:
+     with PtyModbusSlave({0x23: device}) as slave:
+         sensor = DFRobot_UVIndex240370Sensor_UART(port=slave.port)
+  3. 录制真实总线事务并回放:
+     - 录制: PatchUVSensor(i2c=RecordingBus(I2C(1), "field.jsonl"))
+     - 回放: PatchUVSensor(i2c=ReplayBus("field.jsonl"))
+'''
+
+import json
+import os
+import struct
+import threading
+import time
+
+from uv_calibration import DEFAULT_CALIBRATION
+
+SENSOR_ADDR = 0x23
+REG_PID = 0x00
+REG_DATA = 0x06
+REG_INDEX = 0x07
+REG_RISK = 0x08
+DEVICE_ID = 0x427c
+READ_INPUT_REGISTERS = 0x04
+
+# 会被录制/回放的总线操作
+BUS_OPS = ("readfrom_mem", "read", "read_i2c_block_data", "execute")
+
+
+def crc16_modbus(data):
+    """计算Modbus RTU CRC16"""
+    crc = 0xFFFF
+    for byte in data:
+        crc ^= byte
+        for _ in range(8):
+            crc = (crc >> 1) ^ 0xA001 if crc & 1 else crc >> 1
+    return crc
+
+
+class FakeUVDevice:
+    """寄存器表假设备，同时提供PinPong、smbus和modbus_tk主站的读取接口
+
+    registers中每个寄存器为16位，byte_order为I2C线上的字节序(真实传感器为低字节在前)。
+    """
+
+    def __init__(self, registers=None, addr=SENSOR_ADDR, byte_order='little', latency=0.0):
+        self.addr = addr
+        self.byte_order = byte_order
+        self.latency = latency
+        self.registers = {REG_PID: DEVICE_ID, REG_DATA: 0, REG_INDEX: 0, REG_RISK: 0}
+        if registers:
+            self.registers.update(registers)
+        self.transactions = 0
+        self._errors = 0
+        self._lock = threading.Lock()
+
+    def set_reading(self, raw, index=None, risk=None):
+        """设置原始值，未指定的UV指数和风险等级按官方断点表计算"""
+        if index is None:
+            index = DEFAULT_CALIBRATION.index(raw)
+        if risk is None:
+            risk = DEFAULT_CALIBRATION.risk(index)
+        self.registers[REG_DATA] = raw
+        self.registers[REG_INDEX] = index
+        self.registers[REG_RISK] = risk
+
+    def inject_errors(self, count=1):
+        """之后的count次事务抛出OSError，模拟总线错误"""
+        self._errors += count
+
+    def read_registers(self, reg, count):
+        """读取count个连续16位寄存器"""
+        with self._lock:
+            self.transactions += 1
+            if self.latency:
+                time.sleep(self.latency)
+            if self._errors > 0:
+                self._errors -= 1
+                raise OSError("模拟总线错误")
+            return [self.registers.get(reg + i, 0) & 0xFFFF for i in range(count)]
+
+    def read_bytes(self, reg, length):
+        """按I2C线上字节序读取length个字节"""
+        words = self.read_registers(reg, (length + 1) // 2)
+        fmt = ('<' if self.byte_order == 'little' else '>') + 'H' * len(words)
+        return list(struct.pack(fmt, *words)[:length])
+
+    # PinPong I2C接口
+    def readfrom_mem(self, addr, reg, length):
+        self._check_addr(addr)
+        return self.read_bytes(reg, length)
+
+    read = readfrom_mem
+
+    # smbus接口
+    def read_i2c_block_data(self, addr, reg, length):
+        self._check_addr(addr)
+        return self.read_bytes(reg, length)
+
+    # modbus_tk RtuMaster接口
+    def execute(self, slave, function_code, starting_address, quantity_of_x):
+        self._check_addr(slave)
+        if function_code != READ_INPUT_REGISTERS:
+            raise ValueError("不支持的功能码: %d" % function_code)
+        return tuple(self.read_registers(starting_address, quantity_of_x))
+
+    def set_timeout(self, timeout):
+        pass
+
+    def _check_addr(self, addr):
+        if addr != self.addr:
+            raise OSError("地址0x%02X无应答" % addr)
+
+
+class PtyModbusSlave:
+    """在pty上运行的Modbus RTU从机，为串口驱动提供本地测试对端
+
+    devices为{从机地址: FakeUVDevice}，只实现读输入寄存器(功能码0x04)，
+    未知地址或CRC错误的请求不应答，与真实总线一致。
+    """
+
+    def __init__(self, devices, response_delay=0.0):
+        self.devices = dict(devices)
+        self.response_delay = response_delay
+        self.port = None
+        self.requests = 0
+        self._master_fd = None
+        self._slave_fd = None
+        self._thread = None
+        self._running = False
+
+    def start(self):
+        """打开pty并启动从机线程，返回串口设备名"""
+        import pty
+        import tty
+        self._master_fd, self._slave_fd = pty.openpty()
+        tty.setraw(self._master_fd)
+        tty.setraw(self._slave_fd)
+        self.port = os.ttyname(self._slave_fd)
+        self._running = True
+        self._thread = threading.Thread(target=self._serve, name="PtyModbusSlave", daemon=True)
+        self._thread.start()
+        return self.port
+
+    def stop(self):
+        """停止从机并关闭pty"""
+        self._running = False
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        for fd in (self._master_fd, self._slave_fd):
+            if fd is not None:
+                os.close(fd)
+        self._master_fd = self._slave_fd = None
+
+    def _serve(self):
+        import select
+        buffer = b""
+        while self._running:
+            ready, _, _ = select.select([self._master_fd], [], [], 0.05)
+            if not ready:
+                # 帧间静默，丢弃不完整的数据
+                buffer = b""
+                continue
+            buffer += os.read(self._master_fd, 256)
+            while len(buffer) >= 8:
+                frame, buffer = buffer[:8], buffer[8:]
+                response = self._handle(frame)
+                if response is not None:
+                    if self.response_delay:
+                        time.sleep(self.response_delay)
+                    os.write(self._master_fd, response)
+
+    def _handle(self, frame):
+        if crc16_modbus(frame[:6]) != struct.unpack('<H', frame[6:])[0]:
+            return None
+        slave, function_code, start, count = struct.unpack('>BBHH', frame[:6])
+        device = self.devices.get(slave)
+        if device is None or function_code != READ_INPUT_REGISTERS:
+            return None
+        self.requests += 1
+        try:
+            values = device.read_registers(start, count)
+        except OSError:
+            return None
+        body = struct.pack('>BBB%dH' % count, slave, function_code, 2 * count, *values)
+        return body + struct.pack('<H', crc16_modbus(body))
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+
+class RecordingBus:
+    """包装真实总线对象，把每次事务(参数、结果、耗时)按JSON行写入文件"""
+
+    def __init__(self, bus, path):
+        self._bus = bus
+        self._file = open(path, 'a')
+        self._start = time.monotonic()
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name):
+        attr = getattr(self._bus, name)
+        if name not in BUS_OPS:
+            return attr
+
+        def recorded(*args):
+            started = time.monotonic()
+            record = {"op": name, "args": list(args), "t": started - self._start}
+            try:
+                result = attr(*args)
+                record["result"] = list(result)
+                return result
+            except Exception as e:
+                record["error"] = str(e)
+                raise
+            finally:
+                record["dt"] = time.monotonic() - started
+                with self._lock:
+                    self._file.write(json.dumps(record) + "\n")
+                    self._file.flush()
+        return recorded
+
+    def close(self):
+        self._file.close()
+
+
+class ReplayBus:
+    """按顺序回放RecordingBus录制的事务
+
+    realtime为True时按录制的间隔和耗时等待，用于复现时序相关的问题；
+    strict为True时要求操作和参数与录制一致，否则抛出ValueError。
+    """
+
+    def __init__(self, path, realtime=False, strict=True, loop=False):
+        with open(path) as f:
+            self._records = [json.loads(line) for line in f if line.strip()]
+        self._realtime = realtime
+        self._strict = strict
+        self._loop = loop
+        self._pos = 0
+        self._start = None
+        self._lock = threading.Lock()
+
+    @property
+    def remaining(self):
+        return len(self._records) - self._pos
+
+    def __getattr__(self, name):
+        if name not in BUS_OPS:
+            raise AttributeError(name)
+        return lambda *args: self._replay(name, args)
+
+    def set_timeout(self, timeout):
+        pass
+
+    def _replay(self, op, args):
+        with self._lock:
+            if self._pos >= len(self._records):
+                if not self._loop or not self._records:
+                    raise EOFError("回放记录已用完")
+                self._pos = 0
+                self._start = None
+            record = self._records[self._pos]
+            self._pos += 1
+        if self._strict and (record["op"] != op or record["args"] != list(args)):
+            raise ValueError("回放不匹配: 录制为%s%s，实际为%s%s"
+                             % (record["op"], tuple(record["args"]), op, tuple(args)))
+        if self._realtime:
+            now = time.monotonic()
+            if self._start is None:
+                self._start = now - record["t"]
+            delay = self._start + record["t"] + record["dt"] - now
+            if delay > 0:
+                time.sleep(delay)
+        if "error" in record:
+            raise OSError(record["error"])
+        result = record["result"]
+        return tuple(result) if op == "execute" else result